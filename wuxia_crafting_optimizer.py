@@ -11,12 +11,16 @@ Rules:
 """
 
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Callable, Dict, FrozenSet, List, Tuple, Optional, Any
 from enum import Enum
-from collections import deque
+from heapq import heappop, heappush
+from array import array
 import argparse
+import copy
+import functools
 import json
 import os
+import re
 
 
 class BuffType(Enum):
@@ -25,8 +29,27 @@ class BuffType(Enum):
     INTENSITY = 2  # 40% buff to intensity
 
 
+def _buffed_stat(base: int, buff_turns: int) -> int:
+    """Return `base` with the +40% buff applied when `buff_turns` is active."""
+    if buff_turns > 0:
+        return int(base * 1.4)
+    return base
+
+
 @dataclass
 class State:
+    # Declared by hand (not `slots=True`) to keep working on Python < 3.10.
+    __slots__ = (
+        "qi",
+        "stability",
+        "max_stability",
+        "completion",
+        "perfection",
+        "control_buff_turns",
+        "intensity_buff_turns",
+        "history",
+    )
+
     qi: int
     stability: int
     max_stability: int  # Current max stability (decreases by 1 each turn)
@@ -34,29 +57,26 @@ class State:
     perfection: int
     control_buff_turns: int  # Remaining turns of control buff
     intensity_buff_turns: int  # Remaining turns of intensity buff
-    history: List[str]
+    history: array  # Skill indices into CraftingOptimizer._skill_keys ("H" codes)
 
     def copy(self):
+        # Positional in field order: cheaper than keyword construction.
         return State(
-            qi=self.qi,
-            stability=self.stability,
-            max_stability=self.max_stability,
-            completion=self.completion,
-            perfection=self.perfection,
-            control_buff_turns=self.control_buff_turns,
-            intensity_buff_turns=self.intensity_buff_turns,
-            history=self.history.copy(),
+            self.qi,
+            self.stability,
+            self.max_stability,
+            self.completion,
+            self.perfection,
+            self.control_buff_turns,
+            self.intensity_buff_turns,
+            self.history[:],
         )
 
     def get_control(self, base_control: int) -> int:
-        if self.control_buff_turns > 0:
-            return int(base_control * 1.4)
-        return base_control
+        return _buffed_stat(base_control, self.control_buff_turns)
 
     def get_intensity(self, base_intensity: int) -> int:
-        if self.intensity_buff_turns > 0:
-            return int(base_intensity * 1.4)
-        return base_intensity
+        return _buffed_stat(base_intensity, self.intensity_buff_turns)
 
     def get_score(self, target_completion: int = 0, target_perfection: int = 0) -> int:
         """Score based on progress toward targets.
@@ -93,96 +113,109 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
 
     If config_path is None, loads `config.json` from next to this script when present,
     otherwise returns the embedded default configuration.
+
+    Parsing and validation are cached per path; each call returns its own copy.
     """
+    return copy.deepcopy(_load_config_cached(_resolve_config_path(config_path)))
+
+
+def _resolve_config_path(config_path: Optional[str]) -> Optional[str]:
+    """Map the `load_config` argument to a cache key; None selects the embedded default."""
     if config_path is None:
         default_path = os.path.join(os.path.dirname(__file__), "config.json")
         if os.path.exists(default_path):
-            config_path = default_path
-        else:
-            # Return embedded default configuration
-            return {
-                "stats": {
-                    "max_qi": 194,
-                    "max_stability": 60,
-                    "base_intensity": 12,
-                    "base_control": 16,
-                    "min_stability": 10,
+            return default_path
+    return config_path
+
+
+@functools.lru_cache(maxsize=4)
+def _load_config_cached(config_path: Optional[str]) -> Dict[str, Any]:
+    """Cached core of `load_config`; the result is shared and must not be mutated."""
+    if config_path is None:
+        # Return embedded default configuration
+        return {
+            "stats": {
+                "max_qi": 194,
+                "max_stability": 60,
+                "base_intensity": 12,
+                "base_control": 16,
+                "min_stability": 10,
+            },
+            "skills": {
+                "simple_fusion": {
+                    "name": "Simple Fusion",
+                    "qi_cost": 0,
+                    "stability_cost": 10,
+                    "completion_gain": 12,
+                    "perfection_gain": 0,
+                    "buff_type": "NONE",
+                    "buff_duration": 0,
+                },
+                "energised_fusion": {
+                    "name": "Energised Fusion",
+                    "qi_cost": 10,
+                    "stability_cost": 10,
+                    "completion_gain": 21,
+                    "perfection_gain": 0,
+                    "buff_type": "NONE",
+                    "buff_duration": 0,
+                },
+                "cycling_fusion": {
+                    "name": "Cycling Fusion",
+                    "qi_cost": 10,
+                    "stability_cost": 10,
+                    "completion_gain": 9,
+                    "perfection_gain": 0,
+                    "buff_type": "CONTROL",
+                    "buff_duration": 2,
+                },
+                "disciplined_touch": {
+                    "name": "Disciplined Touch",
+                    "qi_cost": 10,
+                    "stability_cost": 10,
+                    "completion_gain": 0,
+                    "perfection_gain": 0,
+                    "buff_type": "NONE",
+                    "buff_duration": 0,
+                },
+                "cycling_refine": {
+                    "name": "Cycling Refine",
+                    "qi_cost": 10,
+                    "stability_cost": 10,
+                    "completion_gain": 0,
+                    "perfection_gain": 12,
+                    "buff_type": "INTENSITY",
+                    "buff_duration": 2,
                 },
-                "skills": {
-                    "simple_fusion": {
-                        "name": "Simple Fusion",
-                        "qi_cost": 0,
-                        "stability_cost": 10,
-                        "completion_gain": 12,
-                        "perfection_gain": 0,
-                        "buff_type": "NONE",
-                        "buff_duration": 0,
-                    },
-                    "energised_fusion": {
-                        "name": "Energised Fusion",
-                        "qi_cost": 10,
-                        "stability_cost": 10,
-                        "completion_gain": 21,
-                        "perfection_gain": 0,
-                        "buff_type": "NONE",
-                        "buff_duration": 0,
-                    },
-                    "cycling_fusion": {
-                        "name": "Cycling Fusion",
-                        "qi_cost": 10,
-                        "stability_cost": 10,
-                        "completion_gain": 9,
-                        "perfection_gain": 0,
-                        "buff_type": "CONTROL",
-                        "buff_duration": 2,
-                    },
-                    "disciplined_touch": {
-                        "name": "Disciplined Touch",
-                        "qi_cost": 10,
-                        "stability_cost": 10,
-                        "completion_gain": 0,
-                        "perfection_gain": 0,
-                        "buff_type": "NONE",
-                        "buff_duration": 0,
-                    },
-                    "cycling_refine": {
-                        "name": "Cycling Refine",
-                        "qi_cost": 10,
-                        "stability_cost": 10,
-                        "completion_gain": 0,
-                        "perfection_gain": 12,
-                        "buff_type": "INTENSITY",
-                        "buff_duration": 2,
-                    },
-                    "simple_refine": {
-                        "name": "Simple Refine",
-                        "qi_cost": 18,
-                        "stability_cost": 10,
-                        "completion_gain": 0,
-                        "perfection_gain": 16,
-                        "buff_type": "NONE",
-                        "buff_duration": 0,
-                    },
-                    "forceful_stabilize": {
-                        "name": "Forceful Stabilize",
-                        "qi_cost": 88,
-                        "stability_cost": -40,
-                        "completion_gain": 0,
-                        "perfection_gain": 0,
-                        "buff_type": "NONE",
-                        "buff_duration": 0,
-                    },
-                    "instant_restoration": {
-                        "name": "Instant Restoration",
-                        "qi_cost": 44,
-                        "stability_cost": -15,
-                        "completion_gain": 0,
-                        "perfection_gain": 0,
-                        "buff_type": "NONE",
-                        "buff_duration": 0,
-                    },
+                "simple_refine": {
+                    "name": "Simple Refine",
+                    "qi_cost": 18,
+                    "stability_cost": 10,
+                    "completion_gain": 0,
+                    "perfection_gain": 16,
+                    "buff_type": "NONE",
+                    "buff_duration": 0,
                 },
-            }
+                "forceful_stabilize": {
+                    "name": "Forceful Stabilize",
+                    "qi_cost": 88,
+                    "stability_cost": -40,
+                    "completion_gain": 0,
+                    "perfection_gain": 0,
+                    "buff_type": "NONE",
+                    "buff_duration": 0,
+                },
+                "instant_restoration": {
+                    "name": "Instant Restoration",
+                    "qi_cost": 44,
+                    "stability_cost": -15,
+                    "completion_gain": 0,
+                    "perfection_gain": 0,
+                    "buff_type": "NONE",
+                    "buff_duration": 0,
+                },
+            },
+        }
 
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
@@ -232,10 +265,24 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     return config
 
 
+# How a skill's gains are computed (see CraftingOptimizer._skill_gains).
+_GAIN_FIXED = 0
+_GAIN_DISCIPLINED_TOUCH = 1
+_GAIN_CYCLING_REFINE = 2
+_GAIN_SIMPLE_REFINE = 3
+
+_GAIN_KINDS = {
+    "disciplined_touch": _GAIN_DISCIPLINED_TOUCH,
+    "cycling_refine": _GAIN_CYCLING_REFINE,
+    "simple_refine": _GAIN_SIMPLE_REFINE,
+}
+
+
 class CraftingOptimizer:
     def __init__(self, config_path: Optional[str] = None):
         # Load configuration
-        config = load_config(config_path)
+        # The cached dict is shared and only read here, so skip load_config's copy
+        config = _load_config_cached(_resolve_config_path(config_path))
 
         # Base stats from config
         stats = config["stats"]
@@ -247,6 +294,13 @@ class CraftingOptimizer:
             "min_stability"
         ]  # Must restore BEFORE going below this
 
+        # (unbuffed, buffed) stat values, indexed by `buff_turns > 0`
+        self._intensity_levels = (
+            self.base_intensity,
+            _buffed_stat(self.base_intensity, 1),
+        )
+        self._control_levels = (self.base_control, _buffed_stat(self.base_control, 1))
+
         # Convert skills from config format to internal tuple format
         # Internal format: (name, qi_cost, stability_cost, completion_gain, perfection_gain, buff_type, buff_duration, prevents_max_stability_decay)
         buff_type_map = {
@@ -268,6 +322,220 @@ class CraftingOptimizer:
                 skill_data.get("prevents_max_stability_decay", False),
             )
 
+        # Index-based view of the skill table for the search hot path.
+        # Format: (qi_cost, stability_cost, gain_kind, completion_gain, perfection_gain,
+        #          buff_type, buff_duration, prevents_max_stability_decay)
+        self._skill_keys: List[str] = list(self.skills)
+        self._skill_index: Dict[str, int] = {
+            skill_key: idx for idx, skill_key in enumerate(self._skill_keys)
+        }
+        # Display name -> skill key (first skill wins if two share a name)
+        self._name_to_key: Dict[str, str] = {}
+        for skill_key, skill in self.skills.items():
+            self._name_to_key.setdefault(skill[0], skill_key)
+        self._skill_arr: List[Tuple[int, int, int, int, int, BuffType, int, bool]] = []
+        for skill_key in self._skill_keys:
+            _, qi_cost, stability_cost, base_comp, base_perf, buff, dur, no_decay = (
+                self.skills[skill_key]
+            )
+            self._skill_arr.append(
+                (
+                    qi_cost,
+                    stability_cost,
+                    _GAIN_KINDS.get(skill_key, _GAIN_FIXED),
+                    base_comp,
+                    base_perf,
+                    buff,
+                    dur,
+                    no_decay,
+                )
+            )
+
+        # Gains for every buff combination, one table per control condition:
+        # table[skill_idx][control_buff_active][intensity_buff_active] -> (comp, perf)
+        # Only the buff on/off bits matter, so a table covers all states. Built lazily
+        # by `_gains_for`; `self._gains` is the neutral (1.0) table used by the search.
+        self._gains_by_cond: Dict[
+            float, List[Tuple[Tuple[Tuple[int, int], ...], ...]]
+        ] = {}
+        self._gains = self._gains_for(1.0)
+
+        # Straight-line versions of `_apply_skill_fast`, one per skill, with its costs,
+        # gains and buff handling baked in as constants. Compiled lazily per control
+        # condition (see `_apply_fns_for`); the neutral set is used by the search.
+        self._apply_fns_by_cond: Dict[float, List[Callable]] = {}
+        self._apply_fns: List[
+            Callable[
+                [Tuple[int, int, int, int, int], int, int],
+                Optional[Tuple[Tuple[int, int, int, int, int], int, int]],
+            ]
+        ] = self._apply_fns_for(1.0)
+
+        # Per-action gain limits used by `_gain_bound` (an admissible estimate of how
+        # much completion/perfection is still reachable from a resource state; the
+        # limits come from `_max_gains`, which floors negative gains at 0).
+        # Skills that spend stability are limited by the stability budget; all other
+        # skills are limited by qi. `None` means the config allows unbounded actions.
+        self._bound_params: Optional[Tuple[int, ...]] = None
+        spend = [i for i, sk in enumerate(self._skill_arr) if sk[1] > 0]
+        other = [
+            i
+            for i, sk in enumerate(self._skill_arr)
+            if sk[1] <= 0 and (sk[1] < 0 or self._max_gains(i)[2] > 0)
+        ]
+        if all(self._skill_arr[i][0] > 0 for i in other):
+            restore_amount, restore_qi = max(
+                ((-self._skill_arr[i][1], self._skill_arr[i][0]) for i in other),
+                key=lambda r: r[0] / r[1],
+                default=(0, 1),
+            )
+            spend_max = [self._max_gains(i) for i in spend] or [(0, 0, 0)]
+            other_max = [self._max_gains(i) for i in other] or [(0, 0, 0)]
+            self._bound_params = (
+                min((self._skill_arr[i][1] for i in spend), default=1),
+                min((self._skill_arr[i][0] for i in other), default=1),
+                restore_amount,
+                restore_qi,
+                *(max(g[n] for g in spend_max) for n in range(3)),
+                *(max(g[n] for g in other_max) for n in range(3)),
+            )
+
+        # Feasibility thresholds for `is_terminal`: the cheapest qi cost among skills
+        # that don't spend stability, and the non-dominated (qi_cost, stability_cost)
+        # pairs among skills that do (usually just one).
+        self._min_free_qi_cost: float = min(
+            (sk[0] for sk in self._skill_arr if sk[1] <= 0), default=float("inf")
+        )
+        self._spend_costs: List[Tuple[int, int]] = []
+        for qi_cost, stability_cost in sorted(
+            {(sk[0], sk[1]) for sk in self._skill_arr if sk[1] > 0}
+        ):
+            if all(stability_cost < s for _, s in self._spend_costs):
+                self._spend_costs.append((qi_cost, stability_cost))
+
+        # Best (completion, perfection) any single action can add (never negative,
+        # see `_max_gains`); bounds what a depth-limited pass of `_search_core` can
+        # still reach.
+        step_gains = [self._max_gains(i) for i in range(len(self._skill_arr))]
+        self._max_step_gains: Tuple[int, int] = (
+            max((g[0] for g in step_gains), default=0),
+            max((g[1] for g in step_gains), default=0),
+        )
+
+        # Expansion order for the search: best (completion + perfection) per unit of
+        # qi + stability spent first, so strong nodes land in the Pareto buckets early
+        # and later, weaker inserts are rejected on the first comparison.
+        self._ordered_skill_indices: List[int] = sorted(
+            range(len(self._skill_arr)),
+            key=lambda i: -step_gains[i][2]
+            / max(self._skill_arr[i][0] + max(self._skill_arr[i][1], 0), 1),
+        )
+
+        # Skills another skill makes redundant in the search (see `_dominates`).
+        # Whenever a dominated skill is affordable so is its dominator, so they can
+        # be dropped from every feasible-skill row below.
+        self._dominated_skills: FrozenSet[int] = frozenset(
+            b
+            for b in range(len(self._skill_arr))
+            for a in range(len(self._skill_arr))
+            if a != b and self._dominates(a, b)
+        )
+
+        # Non-dominated skills in expansion order
+        self._search_skill_order: Tuple[int, ...] = tuple(
+            i for i in self._ordered_skill_indices if i not in self._dominated_skills
+        )
+
+        # True when every reachable qi lies in 0..max_qi and every stability in
+        # 0..max_stability: no skill refunds qi and the stability floor is not
+        # negative (stability is otherwise only ever capped down to max_stability).
+        self._bounded_resources: bool = (
+            self.max_qi >= 0
+            and self.max_stability >= 0
+            and self.min_stability >= 0
+            and all(sk[0] >= 0 for sk in self._skill_arr)
+        )
+
+        # Feasible skills (in expansion order) for every (qi, stability) the search
+        # can reach: self._feasible_skills[qi][stability]. Lets the expansion loop
+        # skip skills that `_apply_skill_fast` would reject on cost alone, or that
+        # are dominated by another skill. Only built for bounded resources; otherwise
+        # the search tries all of `_search_skill_order` and lets the apply reject.
+        shared: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+        self._feasible_skills: Optional[List[List[Tuple[int, ...]]]] = None
+        if self._bounded_resources:
+            self._feasible_skills = [
+                [
+                    shared.setdefault(row, row)
+                    for row in (
+                        tuple(
+                            i
+                            for i in self._search_skill_order
+                            if qi >= self._skill_arr[i][0]
+                            and (
+                                self._skill_arr[i][1] <= 0
+                                or stability - self._skill_arr[i][1]
+                                >= self.min_stability
+                            )
+                        )
+                        for stability in range(self.max_stability + 1)
+                    )
+                ]
+                for qi in range(self.max_qi + 1)
+            ]
+
+        # Bit layout for packing a full search state into one int key:
+        # qi | stability | max_stability | ctrl_turns | int_turns | completion | perfection
+        # Widths come from the config so no field can spill into its neighbour;
+        # completion gets a generous fixed width and perfection is unbounded on top.
+        # That needs every field below perfection to stay non-negative and within
+        # its width (a negative perfection is fine on top). Completion gains don't
+        # depend on the control condition, so the neutral table covers them. Other
+        # configs key states by their plain tuples instead (slower, same results).
+        max_buff_duration = max((s[6] for s in self._skill_arr), default=0)
+        self._packed_keys: bool = (
+            self._bounded_resources
+            and all(sk[6] >= 0 for sk in self._skill_arr)
+            and all(g[0] >= 0 for table in self._gains for row in table for g in row)
+        )
+        if not self._packed_keys:
+            self._pack_res = self._unpack_res = self._tuple_res
+            self._state_key = self._tuple_state_key
+        widths = [
+            self.max_qi.bit_length(),
+            self.max_stability.bit_length(),
+            self.max_stability.bit_length(),
+            max_buff_duration.bit_length(),
+            max_buff_duration.bit_length(),
+            32,
+        ]
+        self._key_shifts: List[int] = [0]
+        for width in widths:
+            self._key_shifts.append(self._key_shifts[-1] + width)
+
+        # Buff turns only change gains, and qi never rises, so once qi is below the
+        # cheapest skill whose gain depends on a buff, that buff's remaining turns
+        # can no longer matter. `_search_core` clears them from its Pareto/visited
+        # keys so such states share one frontier. Stored as (qi floor, mask) per
+        # buff; a floor of -1 disables the merge.
+        self._buff_key_clears: List[Tuple[int, int]] = []
+        for buff_field, depends in (
+            (3, lambda g: g[0] != g[1]),  # control: compare ctrl_on rows
+            (4, lambda g: any(row[0] != row[1] for row in g)),  # intensity
+        ):
+            qi_floor = -1
+            if self._packed_keys:
+                qi_floor = min(
+                    (
+                        sk[0]
+                        for sk, g in zip(self._skill_arr, self._gains)
+                        if depends(g)
+                    ),
+                    default=self.max_qi + 1,
+                )
+            lo, hi = self._key_shifts[buff_field], self._key_shifts[buff_field + 1]
+            self._buff_key_clears.append((qi_floor, ~((1 << hi) - (1 << lo))))
+
     def calculate_disciplined_touch(self, state: State) -> Tuple[int, int]:
         """Disciplined Touch: 6 Completion and 6 Perfection, both scaling with intensity"""
         intensity = state.get_intensity(self.base_intensity)
@@ -284,18 +552,34 @@ class CraftingOptimizer:
         Important: this must not apply any NEW buffs granted by the skill itself (those only affect
         subsequent turns).
         """
+        return self._gains_for(control_condition)[self._skill_index[skill_key]][
+            state.control_buff_turns > 0
+        ][state.intensity_buff_turns > 0]
 
-        _, _, _, base_comp, base_perf, _, _, _ = self.skills[skill_key]
-        completion_gain = base_comp
-        perfection_gain = base_perf
-
-        if skill_key == "disciplined_touch":
-            completion_gain, perfection_gain = self.calculate_disciplined_touch(state)
-        elif skill_key in ["cycling_refine", "simple_refine"]:
-            # These scale with control (from EXISTING buffs, not new ones)
+    def _skill_gains(
+        self,
+        skill_idx: int,
+        control_buff_turns: int,
+        intensity_buff_turns: int,
+        control_condition: float = 1.0,
+    ) -> Tuple[int, int]:
+        """Index-based core of `calculate_skill_gains` (no State required)."""
+        _, _, gain_kind, completion_gain, perfection_gain, _, _, _ = self._skill_arr[
+            skill_idx
+        ]
+
+        if gain_kind == _GAIN_DISCIPLINED_TOUCH:
+            # Both scale with intensity; base is 6 at 12 intensity
+            intensity = self._intensity_levels[intensity_buff_turns > 0]
+            completion_gain = 6 * intensity // 12
+            perfection_gain = 6 * intensity // 12
+        elif gain_kind != _GAIN_FIXED:
+            # Refines scale with control (from EXISTING buffs, not new ones)
             # plus a per-turn external control condition (e.g. +/- 50%).
-            control = int(state.get_control(self.base_control) * control_condition)
-            if skill_key == "cycling_refine":
+            control = int(
+                self._control_levels[control_buff_turns > 0] * control_condition
+            )
+            if gain_kind == _GAIN_CYCLING_REFINE:
                 perfection_gain = 12 * control // 16  # Base is 12 at 16 control
             else:  # simple_refine
                 perfection_gain = 16 * control // 16
@@ -303,6 +587,206 @@ class CraftingOptimizer:
 
         return completion_gain, perfection_gain
 
+    def _gains_for(
+        self, control_condition: float
+    ) -> List[Tuple[Tuple[Tuple[int, int], ...], ...]]:
+        """Per-skill gain table for one control condition (cached)."""
+        table = self._gains_by_cond.get(control_condition)
+        if table is None:
+            table = self._gains_by_cond[control_condition] = [
+                tuple(
+                    tuple(
+                        self._skill_gains(skill_idx, ctrl_on, int_on, control_condition)
+                        for int_on in (0, 1)
+                    )
+                    for ctrl_on in (0, 1)
+                )
+                for skill_idx in range(len(self._skill_arr))
+            ]
+        return table
+
+    def _apply_fns_for(self, control_condition: float) -> List[Callable]:
+        """Per-skill compiled apply functions for one control condition (cached)."""
+        fns = self._apply_fns_by_cond.get(control_condition)
+        if fns is None:
+            fns = self._apply_fns_by_cond[control_condition] = [
+                self._compile_apply_fn(i, control_condition)
+                for i in range(len(self._skill_arr))
+            ]
+        return fns
+
+    def _compile_apply_fn(
+        self, skill_idx: int, control_condition: float = 1.0
+    ) -> Callable:
+        """Generate `apply(res, comp, perf)` for one skill at one control condition.
+
+        Must stay behaviourally identical to
+        `_apply_skill_fast(res, comp, perf, skill_idx, control_condition)`; only
+        branches that can matter for this skill are emitted.
+        """
+        qi_cost, stability_cost, _, _, _, buff_type, buff_duration, no_decay = (
+            self._skill_arr[skill_idx]
+        )
+        gains = self._gains_for(control_condition)[skill_idx]
+        lines = [
+            "def apply(res, comp, perf):",
+            "    qi, stability, max_stability, ctrl_turns, int_turns = res",
+        ]
+        if qi_cost > 0:
+            lines.append(f"    if qi < {qi_cost}: return None")
+        if stability_cost > 0:
+            lines.append(
+                f"    if stability < {self.min_stability + stability_cost}: return None"
+            )
+
+        # Gains from EXISTING buffs; emit only the buff tests this skill depends on
+        if gains[0][0] == gains[0][1] == gains[1][0] == gains[1][1]:
+            lines.append(f"    comp += {gains[0][0][0]}; perf += {gains[0][0][1]}")
+        elif gains[0] == gains[1]:
+            lines += [
+                "    if int_turns > 0:",
+                f"        comp += {gains[0][1][0]}; perf += {gains[0][1][1]}",
+                "    else:",
+                f"        comp += {gains[0][0][0]}; perf += {gains[0][0][1]}",
+            ]
+        else:
+            for ctrl_on in (1, 0):
+                lines.append("    if ctrl_turns > 0:" if ctrl_on else "    else:")
+                lines += [
+                    "        if int_turns > 0:",
+                    f"            comp += {gains[ctrl_on][1][0]}; perf += {gains[ctrl_on][1][1]}",
+                    "        else:",
+                    f"            comp += {gains[ctrl_on][0][0]}; perf += {gains[ctrl_on][0][1]}",
+                ]
+
+        if qi_cost:
+            lines.append(f"    qi -= {qi_cost}")
+        if stability_cost:
+            lines.append(f"    stability -= {stability_cost}")
+        lines.append("    if stability > max_stability: stability = max_stability")
+
+        # Decrement existing buffs, then apply this skill's buff
+        if buff_type == BuffType.CONTROL:
+            lines.append(f"    ctrl_turns = {buff_duration}")
+        else:
+            lines.append("    if ctrl_turns > 0: ctrl_turns -= 1")
+        if buff_type == BuffType.INTENSITY:
+            lines.append(f"    int_turns = {buff_duration}")
+        else:
+            lines.append("    if int_turns > 0: int_turns -= 1")
+
+        if not no_decay:
+            lines += [
+                "    if max_stability > 0: max_stability -= 1",
+                "    if stability > max_stability: stability = max_stability",
+            ]
+        lines.append(
+            "    return (qi, stability, max_stability, ctrl_turns, int_turns), comp, perf"
+        )
+
+        namespace: Dict[str, Any] = {}
+        exec(
+            compile(
+                "\n".join(lines), f"<apply {self._skill_keys[skill_idx]}>", "exec"
+            ),
+            namespace,
+        )
+        return namespace["apply"]
+
+    def _dominates(self, a: int, b: int) -> bool:
+        """True if skill `a` makes skill `b` redundant for the search (at condition 1.0).
+
+        `a` must cost no more qi or stability, leave buffs exactly as `b` does, decay
+        max stability no more than `b`, and gain at least as much completion and
+        perfection under every buff combination. Swapping `b` for `a` in any rotation
+        then keeps every later action valid and never lowers the result. Identical
+        skills keep only the first in config order.
+        """
+        qi_a, stab_a, _, _, _, buff_a, dur_a, no_decay_a = self._skill_arr[a]
+        qi_b, stab_b, _, _, _, buff_b, dur_b, no_decay_b = self._skill_arr[b]
+        if qi_a > qi_b or stab_a > stab_b or (buff_a, dur_a) != (buff_b, dur_b):
+            return False
+        if no_decay_b and not no_decay_a:
+            return False
+        gains_a = [g for row in self._gains[a] for g in row]
+        gains_b = [g for row in self._gains[b] for g in row]
+        if any(ga[0] < gb[0] or ga[1] < gb[1] for ga, gb in zip(gains_a, gains_b)):
+            return False
+        if (
+            (qi_a, stab_a, no_decay_a) == (qi_b, stab_b, no_decay_b)
+            and gains_a == gains_b
+        ):
+            return a < b
+        return True
+
+    def _max_gains(self, skill_idx: int) -> Tuple[int, int, int]:
+        """Best (completion, perfection, completion + perfection) over buff states.
+
+        Each gain is floored at 0 first: the remaining actions need not include this
+        skill, and a capped target score can rise by a positive gain on one axis
+        while the other falls. That keeps `_gain_bound` admissible for negative gains.
+        """
+        combos = [
+            (max(c, 0), max(p, 0)) for row in self._gains[skill_idx] for c, p in row
+        ]
+        return (
+            max(c for c, _ in combos),
+            max(p for _, p in combos),
+            max(c + p for c, p in combos),
+        )
+
+    def _gain_bound(
+        self, res: Tuple[int, int, int, int, int]
+    ) -> Optional[Tuple[int, int, int]]:
+        """Upper bound on further (completion, perfection, total) gains from `res`.
+
+        Ignores max-stability decay and buff timing, so it never underestimates.
+        Returns None when the config allows an unbounded number of actions.
+        """
+        if self._bound_params is None:
+            return None
+        (
+            min_spend_cost,
+            min_other_qi,
+            restore_amount,
+            restore_qi,
+            spend_comp,
+            spend_perf,
+            spend_total,
+            other_comp,
+            other_perf,
+            other_total,
+        ) = self._bound_params
+        qi, stability = res[0], res[1]
+        restorable = qi * restore_amount // restore_qi
+        spend_actions = max(0, stability - self.min_stability + restorable) // min_spend_cost
+        other_actions = qi // min_other_qi
+        return (
+            spend_actions * spend_comp + other_actions * other_comp,
+            spend_actions * spend_perf + other_actions * other_perf,
+            spend_actions * spend_total + other_actions * other_total,
+        )
+
+    def _score_upper_bound(
+        self,
+        gain_bound: Optional[Tuple[int, int, int]],
+        comp: int,
+        perf: int,
+        target_completion: int = 0,
+        target_perfection: int = 0,
+    ) -> float:
+        """Optimistic final score for a node, given its `_gain_bound`."""
+        if gain_bound is None:
+            return float("inf")
+        add_comp, add_perf, add_total = gain_bound
+        if target_completion == 0 and target_perfection == 0:
+            return min(comp + add_comp, perf + add_perf, (comp + perf + add_total) // 2)
+        return min(
+            min(comp + add_comp, target_completion)
+            + min(perf + add_perf, target_perfection),
+            min(comp, target_completion) + min(perf, target_perfection) + add_total,
+        )
+
     def apply_skill(
         self, state: State, skill_key: str, control_condition: float = 1.0
     ) -> Optional[State]:
@@ -311,160 +795,266 @@ class CraftingOptimizer:
         `control_condition` is a per-turn multiplier applied to Control-based skills
         (e.g. random condition that changes Qi control by +/- 50%).
         """
-        skill = self.skills[skill_key]
+        result = self._apply_skill_fast(
+            (
+                state.qi,
+                state.stability,
+                state.max_stability,
+                state.control_buff_turns,
+                state.intensity_buff_turns,
+            ),
+            state.completion,
+            state.perfection,
+            self._skill_index[skill_key],
+            control_condition,
+        )
+        if result is None:
+            return None
+
+        (qi, stability, max_stability, ctrl_turns, int_turns), comp, perf = result
+        history = array("H", state.history)
+        history.append(self._skill_index[skill_key])
+        # Positional in State field order (see State.copy)
+        return State(
+            qi,
+            stability,
+            max_stability,
+            comp,
+            perf,
+            ctrl_turns,
+            int_turns,
+            history,
+        )
+
+    def _apply_skill_fast(
+        self,
+        res: Tuple[int, int, int, int, int],
+        comp: int,
+        perf: int,
+        skill_idx: int,
+        control_condition: float = 1.0,
+    ) -> Optional[Tuple[Tuple[int, int, int, int, int], int, int]]:
+        """Tuple-based reference path behind `apply_skill`.
+
+        The search and lookahead use the per-skill functions from `_compile_apply_fn`
+        instead, which must match this implementation.
+
+        `res` is (qi, stability, max_stability, control_buff_turns, intensity_buff_turns).
+        Returns (new_res, new_completion, new_perfection), or None if invalid.
+        """
+        qi, stability, max_stability, ctrl_turns, int_turns = res
         (
-            name,
             qi_cost,
             stability_cost,
-            completion_gain,
-            perfection_gain,
+            _,
+            _,
+            _,
             buff_type,
             buff_duration,
             prevents_max_stability_decay,
-        ) = skill
-
-        new_state = state.copy()
+        ) = self._skill_arr[skill_idx]
 
         # Check resources
-        if new_state.qi < qi_cost:
+        if qi < qi_cost:
             return None
 
         # CRITICAL: Stability must stay >= min_stability (10)
         # If this skill costs stability and would drop us below min_stability, reject it
-        if (
-            stability_cost > 0
-            and new_state.stability - stability_cost < self.min_stability
-        ):
+        if stability_cost > 0 and stability - stability_cost < self.min_stability:
             return None
 
         # Calculate gains BEFORE applying buffs from this skill
         # (buffs from cycling skills apply to NEXT turns, not this turn)
-        completion_gain, perfection_gain = self.calculate_skill_gains(
-            state, skill_key, control_condition=control_condition
-        )
+        completion_gain, perfection_gain = self._gains_for(control_condition)[
+            skill_idx
+        ][ctrl_turns > 0][int_turns > 0]
 
         # Apply costs
-        new_state.qi -= qi_cost
-        new_state.stability -= stability_cost
+        qi -= qi_cost
+        stability -= stability_cost
 
         # Cap stability at current max
-        if new_state.stability > new_state.max_stability:
-            new_state.stability = new_state.max_stability
-
-        # Apply gains
-        new_state.completion += completion_gain
-        new_state.perfection += perfection_gain
+        if stability > max_stability:
+            stability = max_stability
 
         # Decrement existing buff durations first
-        if new_state.control_buff_turns > 0:
-            new_state.control_buff_turns -= 1
-        if new_state.intensity_buff_turns > 0:
-            new_state.intensity_buff_turns -= 1
+        if ctrl_turns > 0:
+            ctrl_turns -= 1
+        if int_turns > 0:
+            int_turns -= 1
 
         # Apply NEW buffs from this skill (they will be active next turn)
         if buff_type == BuffType.CONTROL:
-            new_state.control_buff_turns = buff_duration
+            ctrl_turns = buff_duration
         elif buff_type == BuffType.INTENSITY:
-            new_state.intensity_buff_turns = buff_duration
+            int_turns = buff_duration
 
         # Decrease max stability by 1 each turn, unless this skill prevents it
         if not prevents_max_stability_decay:
-            new_state.max_stability = max(0, new_state.max_stability - 1)
+            max_stability = max(0, max_stability - 1)
             # Also cap current stability to new max
-            if new_state.stability > new_state.max_stability:
-                new_state.stability = new_state.max_stability
+            if stability > max_stability:
+                stability = max_stability
 
-        new_state.history.append(name)
-        return new_state
+        return (
+            (qi, stability, max_stability, ctrl_turns, int_turns),
+            comp + completion_gain,
+            perf + perfection_gain,
+        )
 
     def is_terminal(self, state: State) -> bool:
         """Check if we've reached a terminal state (no valid actions possible)"""
-        # Check if any action is possible
-        for skill_key in self.skills:
-            skill = self.skills[skill_key]
-            _, qi_cost, stability_cost, _, _, _, _, prevents_max_stability_decay = skill
-            # Check qi requirement
-            if state.qi < qi_cost:
-                continue
-            # Check stability requirement - must stay >= min_stability after action
-            if (
-                stability_cost > 0
-                and state.stability - stability_cost < self.min_stability
-            ):
-                continue
-            # This action is valid
+        # Skills that don't spend stability only need qi
+        if state.qi >= self._min_free_qi_cost:
             return False
+        # Stability must stay >= min_stability after a spending action
+        budget = state.stability - self.min_stability
+        for qi_cost, stability_cost in self._spend_costs:
+            if state.qi >= qi_cost and stability_cost <= budget:
+                return False
         return True
 
-    @dataclass(frozen=True)
-    class _Resources:
-        qi: int
-        stability: int
-        max_stability: int
-        control_buff_turns: int
-        intensity_buff_turns: int
-
-    @dataclass
-    class _Node:
-        completion: int
-        perfection: int
-        prev_res: Optional["CraftingOptimizer._Resources"]
-        prev_node_idx: Optional[int]
-        action_name: Optional[str]
-
-        def score(self, target_completion: int = 0, target_perfection: int = 0) -> int:
-            if target_completion == 0 and target_perfection == 0:
-                return min(self.completion, self.perfection)
-            comp_progress = min(self.completion, target_completion)
-            perf_progress = min(self.perfection, target_perfection)
-            return comp_progress + perf_progress
-
-    def _dominates(
-        self, a: "CraftingOptimizer._Node", b: "CraftingOptimizer._Node"
-    ) -> bool:
-        return a.completion >= b.completion and a.perfection >= b.perfection
+    @staticmethod
+    def _node_score(
+        completion: int,
+        perfection: int,
+        target_completion: int = 0,
+        target_perfection: int = 0,
+    ) -> int:
+        """Same scoring as `State.get_score`, on bare integers."""
+        if target_completion == 0 and target_perfection == 0:
+            return min(completion, perfection)
+        return min(completion, target_completion) + min(perfection, target_perfection)
+
+    class _NodeArena:
+        """Flat per-node columns for the search; a node id indexes every column.
+
+        Each resource state's Pareto frontier is a chain threaded through
+        `next_in_bucket` (-1 terminates), starting at the head id stored for that
+        state, so the frontier needs no per-state container objects. `dominated`
+        flags nodes that a later insert unlinked from their chain.
+        """
+
+        __slots__ = (
+            "comps",
+            "perfs",
+            "parents",
+            "actions",
+            "next_in_bucket",
+            "dominated",
+        )
+
+        def __init__(self):
+            self.comps = array("i")
+            self.perfs = array("i")
+            self.parents = array("i")
+            self.actions = array("i")
+            self.next_in_bucket = array("i")
+            self.dominated = bytearray()
 
     def _insert_pareto(
         self,
-        frontier: Dict["CraftingOptimizer._Resources", List["CraftingOptimizer._Node"]],
-        res: "CraftingOptimizer._Resources",
-        node: "CraftingOptimizer._Node",
-    ) -> Optional[int]:
-        """Insert node into pareto frontier for a given resource state.
-
-        Returns the index of the inserted node within frontier[res] if kept,
-        otherwise None if dominated.
+        heads: Dict[int, int],
+        arena: "CraftingOptimizer._NodeArena",
+        res: int,
+        completion: int,
+        perfection: int,
+        parent: int,
+        action: int,
+    ) -> int:
+        """Insert (completion, perfection) into the pareto frontier for `res`.
+
+        Returns the new node id if kept, or -1 if dominated by an existing entry.
+        Entries the new one dominates are unlinked from the chain in the same pass.
         """
-        lst = frontier.setdefault(res, [])
+        comps = arena.comps
+        perfs = arena.perfs
+        next_in_bucket = arena.next_in_bucket
+
+        # The chain is an antichain, so the new entry is either dominated by some
+        # entry (discard it) or may dominate some (unlink them), never both. Unlinked
+        # nodes keep their arena slots, so parent links and queued ids stay valid;
+        # anything they would have rejected, the new entry rejects too.
+        head = heads.get(res, -1)
+        prev = -1
+        node = head
+        while node >= 0:
+            comp = comps[node]
+            perf = perfs[node]
+            if comp >= completion and perf >= perfection:
+                return -1
+            following = next_in_bucket[node]
+            if comp <= completion and perf <= perfection:
+                arena.dominated[node] = 1
+                if prev < 0:
+                    head = following
+                else:
+                    next_in_bucket[prev] = following
+            else:
+                prev = node
+            node = following
+
+        new_id = len(comps)
+        comps.append(completion)
+        perfs.append(perfection)
+        arena.parents.append(parent)
+        arena.actions.append(action)
+        next_in_bucket.append(head)
+        arena.dominated.append(0)
+        heads[res] = new_id
+        return new_id
+
+    def _pack_res(self, res: Tuple[int, int, int, int, int]) -> int:
+        """Pack (qi, stability, max_stability, ctrl_turns, int_turns) into one int."""
+        _, s_stab, s_max, s_ctrl, s_int, _, _ = self._key_shifts
+        qi, stability, max_stability, ctrl_turns, int_turns = res
+        return (
+            qi
+            | stability << s_stab
+            | max_stability << s_max
+            | ctrl_turns << s_ctrl
+            | int_turns << s_int
+        )
 
-        # If dominated by existing, discard
-        for existing in lst:
-            if self._dominates(existing, node):
-                return None
+    def _unpack_res(self, res_key: int) -> Tuple[int, int, int, int, int]:
+        """Inverse of `_pack_res`."""
+        _, s_stab, s_max, s_ctrl, s_int, s_comp, _ = self._key_shifts
+        return (
+            res_key & ((1 << s_stab) - 1),
+            (res_key >> s_stab) & ((1 << (s_max - s_stab)) - 1),
+            (res_key >> s_max) & ((1 << (s_ctrl - s_max)) - 1),
+            (res_key >> s_ctrl) & ((1 << (s_int - s_ctrl)) - 1),
+            (res_key >> s_int) & ((1 << (s_comp - s_int)) - 1),
+        )
 
-        # IMPORTANT: Don't physically remove dominated nodes here.
-        # We keep indices stable because the search queue stores (res, idx).
-        lst.append(node)
-        return len(lst) - 1
+    def _state_key(self, res_key: int, comp: int, perf: int) -> int:
+        """Extend a packed resource key with (completion, perfection)."""
+        return res_key | comp << self._key_shifts[5] | perf << self._key_shifts[6]
 
+    @staticmethod
+    def _tuple_res(
+        res: Tuple[int, int, int, int, int]
+    ) -> Tuple[int, int, int, int, int]:
+        """`_pack_res` / `_unpack_res` for configs that can't be packed (identity)."""
+        return res
+
+    @staticmethod
+    def _tuple_state_key(
+        res: Tuple[int, int, int, int, int], comp: int, perf: int
+    ) -> Tuple[Tuple[int, int, int, int, int], int, int]:
+        """`_state_key` for configs that can't be packed."""
+        return (res, comp, perf)
+
+    @staticmethod
     def _reconstruct_history(
-        self,
-        frontier: Dict["CraftingOptimizer._Resources", List["CraftingOptimizer._Node"]],
-        end_res: "CraftingOptimizer._Resources",
-        end_idx: int,
-    ) -> List[str]:
-        actions: List[str] = []
-        res = end_res
-        idx = end_idx
-        while True:
-            node = frontier[res][idx]
-            if node.action_name is None:
-                break
-            actions.append(node.action_name)
-            if node.prev_res is None or node.prev_node_idx is None:
-                break
-            res = node.prev_res
-            idx = node.prev_node_idx
+        parents: array, node_actions: array, end_node: int
+    ) -> List[int]:
+        """Walk the parent links back from a node; returns skill indices in order."""
+        actions: List[int] = []
+        node = end_node
+        while parents[node] >= 0:
+            actions.append(node_actions[node])
+            node = parents[node]
         actions.reverse()
         return actions
 
@@ -480,93 +1070,233 @@ class CraftingOptimizer:
         If target_completion and target_perfection are provided (non-zero),
         the search optimizes toward reaching those targets.
         """
-        start_res = self._Resources(
-            qi=self.max_qi,
-            stability=self.max_stability,
-            max_stability=self.max_stability,
-            control_buff_turns=0,
-            intensity_buff_turns=0,
+        res, completion, perfection, actions = self._search_core(
+            target_completion, target_perfection
         )
-        frontier: Dict[CraftingOptimizer._Resources, List[CraftingOptimizer._Node]] = {}
-        start_node = self._Node(
-            completion=0,
-            perfection=0,
-            prev_res=None,
-            prev_node_idx=None,
-            action_name=None,
+        if (
+            target_completion > 0
+            and target_perfection > 0
+            and completion >= target_completion
+            and perfection >= target_perfection
+        ):
+            # Best-first may meet the targets with a longer rotation than needed.
+            # Iterative deepening below that length finds the shortest one (each
+            # limited pass is exact); passes are cheap because hopeless branches
+            # are pruned by depth.
+            for depth_limit in range(1, len(actions)):
+                found = self._search_core(
+                    target_completion, target_perfection, depth_limit
+                )
+                if found[1] >= target_completion and found[2] >= target_perfection:
+                    res, completion, perfection, actions = found
+                    break
+        qi, stability, max_stability, ctrl_turns, int_turns = res
+        return State(
+            qi=qi,
+            stability=stability,
+            max_stability=max_stability,
+            completion=completion,
+            perfection=perfection,
+            control_buff_turns=ctrl_turns,
+            intensity_buff_turns=int_turns,
+            history=array("H", actions),
         )
-        self._insert_pareto(frontier, start_res, start_node)
 
-        q = deque([(start_res, 0)])
-        best_res = start_res
-        best_idx = 0
+    def _search_core(
+        self,
+        target_completion: int,
+        target_perfection: int,
+        depth_limit: Optional[int] = None,
+    ) -> Tuple[Tuple[int, int, int, int, int], int, int, List[int]]:
+        """Integer-only core of `search_optimal`.
+
+        Works purely on packed resource keys and skill indices (no State objects or
+        names) and returns (best_res, completion, perfection, skill_indices).
+
+        With `depth_limit`, nodes at that depth are not expanded and, in target mode,
+        children that cannot reach both targets within the remaining depth are
+        pruned. Pareto and visited keys then include the depth, so a limited pass
+        meets the targets whenever any rotation of at most `depth_limit` actions can.
+        """
+        apply_fns = self._apply_fns
+        insert_pareto = self._insert_pareto
+        pack_res = self._pack_res
+        unpack_res = self._unpack_res
+        state_key = self._state_key
+        node_score_of = self._node_score
+        feasible_skills = self._feasible_skills
+        search_skill_order = self._search_skill_order
+
+        start_res = pack_res((self.max_qi, self.max_stability, self.max_stability, 0, 0))
+        # Pareto frontier: packed resource key -> head node id of its chain
+        heads: Dict[int, int] = {}
+        arena = self._NodeArena()
+        insert_pareto(heads, arena, start_res, 0, 0, -1, -1)
+
+        # Transposition table of full states (resources + completion/perfection),
+        # keyed by the packed int from _state_key. Different skill orderings often
+        # reach the exact same state; the Pareto check would reject the duplicate
+        # too, but only after a bucket scan.
+        visited = {state_key(start_res, 0, 0)}
+
+        # Best-first expansion: pop the node with the highest optimistic score
+        # first (ties: highest current score, then insertion order, i.e. node id)
+        # so the target-mode cap and good incumbents are reached sooner. Pareto
+        # pruning is order-independent, so this only changes how fast we get there.
+        # Entries: (-upper_bound, -score, node_id, res, completion, perfection, depth)
+        gain_bound = self._gain_bound
+        score_upper_bound = self._score_upper_bound
+        gain_bounds: Dict[int, Optional[Tuple[int, int, int]]] = {
+            start_res: gain_bound(unpack_res(start_res))
+        }
+        q = [
+            (
+                -score_upper_bound(
+                    gain_bounds[start_res], 0, 0, target_completion, target_perfection
+                ),
+                0,
+                0,
+                start_res,
+                0,
+                0,
+                0,
+            )
+        ]
+        best = q[0]
+        best_score = node_score_of(0, 0, target_completion, target_perfection)
 
         target_score_cap = 0
         target_mode = target_completion > 0 and target_perfection > 0
         if target_mode:
             target_score_cap = target_completion + target_perfection
+        prune_depth = target_mode and depth_limit is not None
+        max_step_comp, max_step_perf = self._max_step_gains
+        dominated = arena.dominated
+        (ctrl_qi_floor, ctrl_clear), (int_qi_floor, int_clear) = self._buff_key_clears
 
         while q:
-            res, idx = q.popleft()
-            node = frontier[res][idx]
-            node_score = node.score(target_completion, target_perfection)
-            if node_score > frontier[best_res][best_idx].score(
-                target_completion, target_perfection
-            ):
-                best_res, best_idx = res, idx
+            entry = heappop(q)
+            _, _, node_id, res, completion, perfection, depth = entry
+            node_score = node_score_of(
+                completion, perfection, target_completion, target_perfection
+            )
+            if node_score > best_score:
+                best, best_score = entry, node_score
+
+            # The heap pops in upper-bound order, so once the bound falls to the
+            # incumbent no queued node can strictly beat it: the search is done.
+            # This relies on `_gain_bound` never underestimating, which is why
+            # `_max_gains` floors negative gains at 0.
+            if -entry[0] <= best_score:
+                break
 
             # In target mode, the score is capped at (target_completion + target_perfection).
             # As soon as we reach that cap, we have an optimal solution and can stop.
             if target_mode and node_score >= target_score_cap:
-                best_res, best_idx = res, idx
+                best = entry
                 break
 
-            state = State(
-                qi=res.qi,
-                stability=res.stability,
-                max_stability=res.max_stability,
-                completion=node.completion,
-                perfection=node.perfection,
-                control_buff_turns=res.control_buff_turns,
-                intensity_buff_turns=res.intensity_buff_turns,
-                history=[],
-            )
+            if depth_limit is None:
+                # A node unlinked since it was queued is dominated by a same-resource
+                # sibling with at least its completion and perfection, whose subtree
+                # covers everything this one could reach. (Not with a depth limit:
+                # that sibling may be deeper, with fewer actions left.)
+                if dominated[node_id]:
+                    continue
+            elif depth >= depth_limit:
+                continue
+            remaining = 0 if depth_limit is None else depth_limit - depth - 1
+
+            res_tuple = unpack_res(res)
 
             # Expand all valid actions
-            for skill_key in self.skills:
-                new_state = self.apply_skill(state, skill_key)
-                if new_state is None:
+            if feasible_skills is None:
+                skill_indices = search_skill_order
+            else:
+                skill_indices = feasible_skills[res_tuple[0]][res_tuple[1]]
+            for skill_idx in skill_indices:
+                result = apply_fns[skill_idx](res_tuple, completion, perfection)
+                if result is None:
                     continue
 
-                new_res = self._Resources(
-                    qi=new_state.qi,
-                    stability=new_state.stability,
-                    max_stability=new_state.max_stability,
-                    control_buff_turns=new_state.control_buff_turns,
-                    intensity_buff_turns=new_state.intensity_buff_turns,
+                new_res_tuple, new_comp, new_perf = result
+                new_res = pack_res(new_res_tuple)
+                if prune_depth:
+                    bound = gain_bounds.get(new_res)
+                    if bound is None:
+                        bound = gain_bounds[new_res] = gain_bound(new_res_tuple)
+                    if (
+                        score_upper_bound(
+                            bound,
+                            new_comp,
+                            new_perf,
+                            target_completion,
+                            target_perfection,
+                        )
+                        < target_score_cap
+                    ):
+                        continue
+                    if (
+                        min(new_comp + remaining * max_step_comp, target_completion)
+                        + min(new_perf + remaining * max_step_perf, target_perfection)
+                        < target_score_cap
+                    ):
+                        continue
+                bucket = new_res
+                if new_res_tuple[0] < ctrl_qi_floor:
+                    bucket &= ctrl_clear
+                if new_res_tuple[0] < int_qi_floor:
+                    bucket &= int_clear
+                key = state_key(bucket, new_comp, new_perf)
+                if depth_limit is not None:
+                    # With a depth limit a node only stands in for the same state at
+                    # its own depth: a shallower copy has more turns left, so merging
+                    # across depths could lose the shortest rotation.
+                    key = (key, depth)
+                    bucket = (bucket, depth)
+                if key in visited:
+                    continue
+                visited.add(key)
+
+                # Branch and bound: a child that cannot strictly beat the incumbent
+                # would only be popped after the search has stopped (the bound is
+                # admissible, see the break above). It is also monotone in
+                # (completion, perfection), so skipping its Pareto insert never
+                # lets through a node it would have dominated.
+                bound = gain_bounds.get(new_res)
+                if bound is None:
+                    bound = gain_bounds[new_res] = gain_bound(new_res_tuple)
+                upper_bound = score_upper_bound(
+                    bound, new_comp, new_perf, target_completion, target_perfection
                 )
-                new_node = self._Node(
-                    completion=new_state.completion,
-                    perfection=new_state.perfection,
-                    prev_res=res,
-                    prev_node_idx=idx,
-                    action_name=self.skills[skill_key][0],
+                if upper_bound <= best_score:
+                    continue
+
+                new_id = insert_pareto(
+                    heads, arena, bucket, new_comp, new_perf, node_id, skill_idx
                 )
-                inserted_idx = self._insert_pareto(frontier, new_res, new_node)
-                if inserted_idx is not None:
-                    q.append((new_res, inserted_idx))
+                if new_id >= 0:
+                    heappush(
+                        q,
+                        (
+                            -upper_bound,
+                            -node_score_of(
+                                new_comp, new_perf, target_completion, target_perfection
+                            ),
+                            new_id,
+                            new_res,
+                            new_comp,
+                            new_perf,
+                            depth + 1,
+                        ),
+                    )
 
-        history = self._reconstruct_history(frontier, best_res, best_idx)
-        best_node = frontier[best_res][best_idx]
-        return State(
-            qi=best_res.qi,
-            stability=best_res.stability,
-            max_stability=best_res.max_stability,
-            completion=best_node.completion,
-            perfection=best_node.perfection,
-            control_buff_turns=best_res.control_buff_turns,
-            intensity_buff_turns=best_res.intensity_buff_turns,
-            history=history,
+        _, _, best_id, best_res, best_comp, best_perf, _ = best
+        return (
+            unpack_res(best_res),
+            best_comp,
+            best_perf,
+            self._reconstruct_history(arena.parents, arena.actions, best_id),
         )
 
     def greedy_search(
@@ -576,104 +1306,128 @@ class CraftingOptimizer:
 
         If targets are provided, prioritizes actions that move toward those targets.
         """
-        state = State(
-            qi=self.max_qi,
-            stability=self.max_stability,
-            max_stability=self.max_stability,
-            completion=0,
-            perfection=0,
-            control_buff_turns=0,
-            intensity_buff_turns=0,
-            history=[],
-        )
+        # Candidates are evaluated on bare tuples; names are only attached at the end.
+        res = (self.max_qi, self.max_stability, self.max_stability, 0, 0)
+        completion = 0
+        perfection = 0
+        actions: List[int] = []
+        node_score = self._node_score
+        # (skill_idx, apply_fn) pairs, built once rather than every step
+        indexed_fns = tuple(enumerate(self._apply_fns))
 
-        while not self.is_terminal(state):
+        while True:
             # Stop early if targets are met
             if target_completion > 0 and target_perfection > 0:
-                if state.targets_met(target_completion, target_perfection):
+                if (
+                    completion >= target_completion
+                    and perfection >= target_perfection
+                ):
                     break
 
             best_next = None
             best_score = -1
 
-            for skill_key in self.skills:
-                new_state = self.apply_skill(state, skill_key)
-                if new_state is not None:
+            for skill_idx, apply_fn in indexed_fns:
+                result = apply_fn(res, completion, perfection)
+                if result is not None:
+                    _, new_comp, new_perf = result
                     if target_completion > 0 or target_perfection > 0:
                         # Score based on progress toward targets
-                        score = new_state.get_score(
-                            target_completion, target_perfection
+                        score = node_score(
+                            new_comp, new_perf, target_completion, target_perfection
                         )
                         # Penalize going over targets (wasted resources)
-                        comp_over = max(0, new_state.completion - target_completion)
-                        perf_over = max(0, new_state.perfection - target_perfection)
+                        comp_over = max(0, new_comp - target_completion)
+                        perf_over = max(0, new_perf - target_perfection)
                         score -= (comp_over + perf_over) * 0.5
                     else:
                         # Legacy behavior: balance completion and perfection
-                        score = new_state.get_score()
-                        diff = abs(new_state.completion - new_state.perfection)
+                        score = min(new_comp, new_perf)
+                        diff = abs(new_comp - new_perf)
                         score -= diff * 0.5  # Penalize imbalance
 
                     if score > best_score:
                         best_score = score
-                        best_next = new_state
+                        best_next = (result, skill_idx)
 
+            # No valid action left (terminal state)
             if best_next is None:
                 break
-            state = best_next
+            (res, completion, perfection), skill_idx = best_next
+            actions.append(skill_idx)
 
-        return state
+        qi, stability, max_stability, ctrl_turns, int_turns = res
+        return State(
+            qi=qi,
+            stability=stability,
+            max_stability=max_stability,
+            completion=completion,
+            perfection=perfection,
+            control_buff_turns=ctrl_turns,
+            intensity_buff_turns=int_turns,
+            history=array("H", actions),
+        )
 
     def simulate_rotation(self, rotation: List[str]) -> State:
         """Simulate a specific rotation"""
-        state = State(
-            qi=self.max_qi,
-            stability=self.max_stability,
-            max_stability=self.max_stability,
-            completion=0,
-            perfection=0,
-            control_buff_turns=0,
-            intensity_buff_turns=0,
-            history=[],
-        )
+        # Stepped on bare tuples like greedy_search; the State is built once at the end.
+        res = (self.max_qi, self.max_stability, self.max_stability, 0, 0)
+        completion = 0
+        perfection = 0
+        actions: List[int] = []
 
         for skill_key in rotation:
-            new_state = self.apply_skill(state, skill_key)
-            if new_state is None:
+            skill_idx = self._skill_index[skill_key]
+            result = self._apply_fns[skill_idx](res, completion, perfection)
+            if result is None:
                 break
-            state = new_state
+            res, completion, perfection = result
+            actions.append(skill_idx)
 
-        return state
+        qi, stability, max_stability, ctrl_turns, int_turns = res
+        return State(
+            qi=qi,
+            stability=stability,
+            max_stability=max_stability,
+            completion=completion,
+            perfection=perfection,
+            control_buff_turns=ctrl_turns,
+            intensity_buff_turns=int_turns,
+            history=array("H", actions),
+        )
 
     def print_state(
         self, state: State, target_completion: int = 0, target_perfection: int = 0
     ):
         """Pretty print a state"""
-        print(f"  Qi: {state.qi}/{self.max_qi}")
-        print(f"  Stability: {state.stability}/{self.max_stability}")
+        lines = [
+            f"  Qi: {state.qi}/{self.max_qi}",
+            f"  Stability: {state.stability}/{self.max_stability}",
+        ]
         if target_completion > 0:
-            print(f"  Completion: {state.completion}/{target_completion}")
+            lines.append(f"  Completion: {state.completion}/{target_completion}")
         else:
-            print(f"  Completion: {state.completion}")
+            lines.append(f"  Completion: {state.completion}")
         if target_perfection > 0:
-            print(f"  Perfection: {state.perfection}/{target_perfection}")
+            lines.append(f"  Perfection: {state.perfection}/{target_perfection}")
         else:
-            print(f"  Perfection: {state.perfection}")
+            lines.append(f"  Perfection: {state.perfection}")
         if target_completion > 0 and target_perfection > 0:
             if state.targets_met(target_completion, target_perfection):
-                print(f"  Status: ✓ TARGETS MET")
+                lines.append(f"  Status: ✓ TARGETS MET")
             else:
                 comp_remaining = max(0, target_completion - state.completion)
                 perf_remaining = max(0, target_perfection - state.perfection)
-                print(
+                lines.append(
                     f"  Remaining: Completion={comp_remaining}, Perfection={perf_remaining}"
                 )
         else:
-            print(f"  Score (min): {state.get_score()}")
-            print(f"  Balance: {abs(state.completion - state.perfection)}")
-        print(f"  History ({len(state.history)} actions):")
-        for i, action in enumerate(state.history, 1):
-            print(f"    {i}. {action}")
+            lines.append(f"  Score (min): {state.get_score()}")
+            lines.append(f"  Balance: {abs(state.completion - state.perfection)}")
+        lines.append(f"  History ({len(state.history)} actions):")
+        for i, action in enumerate(self.history_names(state), 1):
+            lines.append(f"    {i}. {action}")
+        print("\n".join(lines))
 
     def print_detailed_rotation(
         self,
@@ -695,15 +1449,15 @@ class CraftingOptimizer:
             perfection=0,
             control_buff_turns=0,
             intensity_buff_turns=0,
-            history=[],
+            history=array("H"),
         )
 
-        print("\n  Step-by-step breakdown:")
-        print(f"  {'=' * 70}")
-        print(
-            f"  Start: Qi={state.qi}, Stability={state.stability}, Completion=0, Perfection=0"
-        )
-        print(f"  {'=' * 70}")
+        lines = [
+            "\n  Step-by-step breakdown:",
+            f"  {_RULE}",
+            f"  Start: Qi={state.qi}, Stability={state.stability}, Completion=0, Perfection=0",
+            f"  {_RULE}",
+        ]
 
         for i, skill_key in enumerate(rotation_keys, 1):
             old_qi = state.qi
@@ -721,7 +1475,7 @@ class CraftingOptimizer:
             new_state = self.apply_skill(state, skill_key, control_condition=cond)
             if new_state is None:
                 skill_name = self.skills[skill_key][0]
-                print(f"  {i}. {skill_name} - FAILED (insufficient resources)")
+                lines.append(f"  {i}. {skill_name} - FAILED (insufficient resources)")
                 break
 
             qi_change = new_state.qi - old_qi
@@ -741,43 +1495,53 @@ class CraftingOptimizer:
             if control_conditions is not None:
                 cond_str = f" (ControlCond x{cond:g})"
 
-            print(f"  {i}. {skill_name}{buff_display}{cond_str}")
-            print(f"     Qi: {old_qi} -> {new_state.qi} ({qi_change:+d})")
-            print(
+            lines.append(f"  {i}. {skill_name}{buff_display}{cond_str}")
+            lines.append(f"     Qi: {old_qi} -> {new_state.qi} ({qi_change:+d})")
+            lines.append(
                 f"     Stability: {old_stab} -> {new_state.stability} ({stab_change:+d})"
             )
             if comp_change > 0:
-                print(
+                lines.append(
                     f"     Completion: {old_comp} -> {new_state.completion} ({comp_change:+d})"
                 )
             if perf_change > 0:
-                print(
+                lines.append(
                     f"     Perfection: {old_perf} -> {new_state.perfection} ({perf_change:+d})"
                 )
 
             state = new_state
 
-        print(f"  {'=' * 70}")
+        lines.append(f"  {_RULE}")
         if target_completion > 0 or target_perfection > 0:
             score = state.get_score(target_completion, target_perfection)
         else:
             score = state.get_score()
-        print(
+        lines.append(
             f"  Final: Completion={state.completion}, Perfection={state.perfection}, Score={score}"
         )
+        print("\n".join(lines))
+
+    def history_keys(self, state: State) -> List[str]:
+        """Skill keys for the actions in `state.history`, in order."""
+        return [self._skill_keys[i] for i in state.history]
+
+    def history_names(self, state: State) -> List[str]:
+        """Display names for the actions in `state.history`, in order."""
+        return [self.skills[self._skill_keys[i]][0] for i in state.history]
 
     def get_skill_key_from_name(self, name: str) -> str:
         """Get skill key from display name"""
-        for key, skill in self.skills.items():
-            if skill[0] == name:
-                return key
-        raise ValueError(f"Unknown skill display name: {name}")
+        try:
+            return self._name_to_key[name]
+        except KeyError:
+            raise ValueError(f"Unknown skill display name: {name}") from None
+
+
+_FORECAST_SEPARATOR_RE = re.compile(r"\s*,\s*")
 
 
 def _parse_control_forecast(s: str) -> List[float]:
-    parts = [p.strip() for p in s.split(",") if p.strip()]
-    if not parts:
-        return []
+    parts = [p for p in _FORECAST_SEPARATOR_RE.split(s.strip()) if p]
     out: List[float] = []
     for p in parts:
         try:
@@ -797,71 +1561,188 @@ def suggest_next_turn(
     """Return (best_first_skill_key, best_plan_keys, best_score_at_horizon).
 
     Uses a deterministic lookahead over the provided `control_forecast` multipliers.
-    If targets are provided, optimizes toward reaching those targets.
+    If targets are provided, optimizes toward reaching those targets, and once they
+    can be met returns the shortest plan that meets them.
     """
 
     if not control_forecast:
         control_forecast = [1.0]
 
-    memo: Dict[Tuple[int, int, int, int, int, int, int], Tuple[int, List[str]]] = {}
-
-    def key(st: State, i: int) -> Tuple[int, int, int, int, int, int, int]:
-        return (
-            st.qi,
-            st.stability,
-            st.completion,
-            st.perfection,
-            st.control_buff_turns,
-            st.intensity_buff_turns,
-            i,
+    horizon = len(control_forecast)
+    target_mode = target_completion > 0 and target_perfection > 0
+    pack_res = optimizer._pack_res
+    state_key = optimizer._state_key
+    node_score = optimizer._node_score
+
+    # Optimistic (completion, perfection) still addable from turn i onwards: the
+    # best per-turn gains for each remaining forecast value, summed.
+    rest_gains = [(0, 0)] * (horizon + 1)
+    for i in range(horizon - 1, -1, -1):
+        turn_gains = [
+            gain
+            for skill_table in optimizer._gains_for(control_forecast[i])
+            for row in skill_table
+            for gain in row
+        ]
+        rest_gains[i] = (
+            rest_gains[i + 1][0] + max((g[0] for g in turn_gains), default=0),
+            rest_gains[i + 1][1] + max((g[1] for g in turn_gains), default=0),
         )
 
-    def dfs(st: State, i: int) -> Tuple[int, List[str]]:
-        k = key(st, i)
-        if k in memo:
-            return memo[k]
-
-        # Stop early if targets are met
-        if target_completion > 0 and target_perfection > 0:
-            if st.targets_met(target_completion, target_perfection):
-                res = (st.get_score(target_completion, target_perfection), [])
-                memo[k] = res
-                return res
-
-        if i >= len(control_forecast) or optimizer.is_terminal(st):
-            res = (st.get_score(target_completion, target_perfection), [])
-            memo[k] = res
-            return res
-
-        best_val = -1
-        best_plan: List[str] = []
-        cond = control_forecast[i]
-
-        for skill_key in optimizer.skills:
-            ns = optimizer.apply_skill(st, skill_key, control_condition=cond)
-            if ns is None:
+    # Forward pass: levels[i] maps each distinct state reachable after i turns
+    # (packed int key) to (res, completion, perfection); edges[i] maps a state to
+    # its (skill_idx, child_key) moves. States that met the targets or have no
+    # valid action get no edges and score as leaves.
+    #
+    # Branch and bound: scores never decrease along a path, so the best score seen
+    # so far (`incumbent`) is a lower bound on the root's value. A state whose
+    # optimistic bound falls below it can be neither optimal nor tied for optimal,
+    # so it is left unexpanded (its underestimated value never wins a max).
+    root_res = (
+        state.qi,
+        state.stability,
+        state.max_stability,
+        state.control_buff_turns,
+        state.intensity_buff_turns,
+    )
+    root = state_key(pack_res(root_res), state.completion, state.perfection)
+    levels: List[Dict[int, Tuple[Tuple[int, int, int, int, int], int, int]]] = [
+        {root: (root_res, state.completion, state.perfection)}
+    ]
+    edges: List[Dict[int, List[Tuple[int, int]]]] = []
+    incumbent = node_score(
+        state.completion, state.perfection, target_completion, target_perfection
+    )
+    for i, cond in enumerate(control_forecast):
+        # The levels deepen one turn at a time, so once some state meets both
+        # targets no longer plan can score higher: stop and return the shortest one.
+        if target_mode and incumbent == target_completion + target_perfection:
+            horizon = i
+            break
+        next_level: Dict[int, Tuple[Tuple[int, int, int, int, int], int, int]] = {}
+        level_edges: Dict[int, List[Tuple[int, int]]] = {}
+        rest_comp, rest_perf = rest_gains[i]
+        child_rest_comp, child_rest_perf = rest_gains[i + 1]
+        # (skill_idx, apply_fn) pairs, built once per turn rather than per state
+        indexed_fns = tuple(enumerate(optimizer._apply_fns_for(cond)))
+        for key, (res, comp, perf) in levels[-1].items():
+            # Stop early if targets are met
+            if target_mode and comp >= target_completion and perf >= target_perfection:
                 continue
-            v, plan = dfs(ns, i + 1)
-            if v > best_val:
-                best_val = v
-                best_plan = [skill_key] + plan
-
-        if best_val < 0:
-            res = (st.get_score(target_completion, target_perfection), [])
-        else:
-            res = (best_val, best_plan)
-        memo[k] = res
-        return res
+            if (
+                node_score(
+                    comp + rest_comp,
+                    perf + rest_perf,
+                    target_completion,
+                    target_perfection,
+                )
+                < incumbent
+            ):
+                continue
+            moves = []
+            for skill_idx, apply_fn in indexed_fns:
+                result = apply_fn(res, comp, perf)
+                if result is None:
+                    continue
+                _, new_comp, new_perf = result
+                new_score = node_score(
+                    new_comp, new_perf, target_completion, target_perfection
+                )
+                if new_score > incumbent:
+                    incumbent = new_score
+                elif (
+                    node_score(
+                        new_comp + child_rest_comp,
+                        new_perf + child_rest_perf,
+                        target_completion,
+                        target_perfection,
+                    )
+                    < incumbent
+                ):
+                    continue
+                child = state_key(pack_res(result[0]), new_comp, new_perf)
+                if child not in next_level:
+                    next_level[child] = result
+                moves.append((skill_idx, child))
+            if moves:
+                level_edges[key] = moves
+        levels.append(next_level)
+        edges.append(level_edges)
+
+    # Backward pass: best horizon score per state, keeping only the chosen move
+    # (first skill in config order wins ties) so the plan can be replayed after.
+    values = {
+        key: node_score(comp, perf, target_completion, target_perfection)
+        for key, (_, comp, perf) in levels[horizon].items()
+    }
+    choices: List[Dict[int, Tuple[int, int]]] = [{} for _ in range(horizon)]
+    for i in range(horizon - 1, -1, -1):
+        level_values: Dict[int, int] = {}
+        level_choices = choices[i]
+        level_edges = edges[i]
+        for key, (_, comp, perf) in levels[i].items():
+            moves = level_edges.get(key)
+            if moves is None:
+                level_values[key] = node_score(
+                    comp, perf, target_completion, target_perfection
+                )
+                continue
+            best_val = -1
+            for skill_idx, child in moves:
+                v = values[child]
+                if v > best_val:
+                    best_val = v
+                    level_choices[key] = (skill_idx, child)
+            level_values[key] = best_val
+        values = level_values
+
+    best_plan: List[str] = []
+    key = root
+    for level_choices in choices:
+        choice = level_choices.get(key)
+        if choice is None:
+            break
+        skill_idx, key = choice
+        best_plan.append(optimizer._skill_keys[skill_idx])
 
-    best_score, best_plan = dfs(state, 0)
     best_first = best_plan[0] if best_plan else None
-    return best_first, best_plan, best_score
+    return best_first, best_plan, values[root]
+
 
+# Box-drawing borders for the interactive UI (68 columns between the corners)
+_BOX_TOP = "┌" + "─" * 68 + "┐"
+_BOX_MID = "├" + "─" * 68 + "┤"
+_BOX_BOTTOM = "└" + "─" * 68 + "┘"
+_DOUBLE_TOP = "╔" + "═" * 68 + "╗"
+_DOUBLE_BOTTOM = "╚" + "═" * 68 + "╝"
 
+# Indented 50-column cards for the per-turn suggestion and applied-skill boxes,
+# and the rule framing the skill list
+_CARD_TOP = "  ┌" + "─" * 50 + "┐"
+_CARD_BOTTOM = "  └" + "─" * 50 + "┘"
+_DOUBLE_CARD_TOP = "  ╔" + "═" * 50 + "╗"
+_DOUBLE_CARD_BOTTOM = "  ╚" + "═" * 50 + "╝"
+_LIST_RULE = "  " + "─" * 60
+
+# Section rules for the non-interactive CLI report
+_RULE = "=" * 70
+_THIN_RULE = "-" * 70
+
+
+def _box_row(text: str) -> str:
+    """Pad a row (which starts with its left border) out to the right border."""
+    return f"{text:<69}│"
+
+
+def _box_title(title: str) -> str:
+    return "│" + f" {title} ".center(68) + "│"
+
+
+@functools.lru_cache(maxsize=4096)
 def _make_bar(
     current: int, maximum: int, width: int = 20, fill: str = "█", empty: str = "░"
 ) -> str:
-    """Create a text-based progress bar."""
+    """Create a text-based progress bar (cached; the UI redraws the same bars)."""
     if maximum <= 0:
         return empty * width
     ratio = min(current / maximum, 1.0)
@@ -874,11 +1755,34 @@ def _format_skill_details(
     skill_key: str,
     state: State,
     control_condition: float = 1.0,
+    gains: Optional[Tuple[int, int]] = None,
 ) -> str:
-    """Format skill details showing costs and expected gains."""
+    """Format skill details showing costs and expected gains.
+
+    Pass `gains` as (completion, perfection) when the caller already has them.
+    """
     skill = optimizer.skills[skill_key]
-    name, qi_cost, stability_cost, base_comp, base_perf, buff_type, buff_dur, _ = skill
+    _, qi_cost, stability_cost, _, _, buff_type, buff_dur, _ = skill
+    if gains is None:
+        gains = optimizer.calculate_skill_gains(
+            state, skill_key, control_condition=control_condition
+        )
+    comp_gain, perf_gain = gains
+    return _format_skill_effects(
+        qi_cost, stability_cost, comp_gain, perf_gain, buff_type, buff_dur
+    )
+
 
+@functools.lru_cache(maxsize=1024)
+def _format_skill_effects(
+    qi_cost: int,
+    stability_cost: int,
+    comp_gain: int,
+    perf_gain: int,
+    buff_type: BuffType,
+    buff_dur: int,
+) -> str:
+    """Cached string builder behind `_format_skill_details` (primitive args only)."""
     parts = []
 
     # Qi cost
@@ -891,9 +1795,6 @@ def _format_skill_details(
     elif stability_cost < 0:
         parts.append(f"+{-stability_cost} Stab")
 
-    comp_gain, perf_gain = optimizer.calculate_skill_gains(
-        state, skill_key, control_condition=control_condition
-    )
     if comp_gain > 0:
         parts.append(f"+{comp_gain} Comp")
     if perf_gain > 0:
@@ -926,7 +1827,7 @@ def interactive_mode(
         perfection=0,
         control_buff_turns=0,
         intensity_buff_turns=0,
-        history=[],
+        history=array("H"),
     )
 
     # Keep history of states for undo
@@ -938,157 +1839,153 @@ def interactive_mode(
 
     turn = 1
 
-    print()
-    print("╔" + "═" * 68 + "╗")
-    print("║" + " ASCEND FROM NINE MOUNTAINS - INTERACTIVE MODE ".center(68) + "║")
-    print("╚" + "═" * 68 + "╝")
-    print()
-    print("┌" + "─" * 68 + "┐")
-    print("│" + " COMMANDS ".center(68) + "│")
-    print("├" + "─" * 68 + "┤")
-    print("│  Turn 1:   Enter all 4 control multipliers (e.g. '1.5,1,0.5,1')  │")
-    print("│  Turn 2+:  Previous forecast shifts; enter only the new T3 value │")
-    print("│            Or enter 4 values to override, Enter for default      │")
-    print("│                                                                  │")
-    print("│  Actions:  Enter number or name to select skill                  │")
-    print("│            Press Enter to accept suggestion                      │")
-    print("│                                                                  │")
-    print("│  Other:    'help' or 'h' - Show this help                        │")
-    print("│            'undo' or 'u' - Undo last action                      │")
-    print("│            'status' or 's' - Show detailed status                │")
-    print("│            'quit' or 'q' - Exit interactive mode                 │")
-    print("└" + "─" * 68 + "┘")
-    print()
+    print(
+        "\n".join(
+            [
+                "",
+                _DOUBLE_TOP,
+                "║" + " ASCEND FROM NINE MOUNTAINS - INTERACTIVE MODE ".center(68) + "║",
+                _DOUBLE_BOTTOM,
+                "",
+                _BOX_TOP,
+                _box_title("COMMANDS"),
+                _BOX_MID,
+                "│  Turn 1:   Enter all 4 control multipliers (e.g. '1.5,1,0.5,1')  │",
+                "│  Turn 2+:  Previous forecast shifts; enter only the new T3 value │",
+                "│            Or enter 4 values to override, Enter for default      │",
+                "│                                                                  │",
+                "│  Actions:  Enter number or name to select skill                  │",
+                "│            Press Enter to accept suggestion                      │",
+                "│                                                                  │",
+                "│  Other:    'help' or 'h' - Show this help                        │",
+                "│            'undo' or 'u' - Undo last action                      │",
+                "│            'status' or 's' - Show detailed status                │",
+                "│            'quit' or 'q' - Exit interactive mode                 │",
+                _BOX_BOTTOM,
+                "",
+            ]
+        )
+    )
 
     def show_help():
-        print()
-        print("┌" + "─" * 68 + "┐")
-        print("│" + " HELP ".center(68) + "│")
-        print("├" + "─" * 68 + "┤")
-        print("│  FORECAST INPUT                                                   │")
-        print("│    Turn 1: Enter all 4 control conditions (current + next 3)     │")
-        print("│    Turn 2+: Previous forecast shifts automatically:              │")
-        print("│             T1→T0, T2→T1, T3→T2, then you enter new T3           │")
-        print("│    • 1.5 = +50% control (good for perfection skills)              │")
-        print("│    • 1.0 = normal control                                         │")
-        print("│    • 0.5 = -50% control (bad for perfection skills)               │")
-        print("│    You can also enter 4 values to override the entire forecast   │")
-        print("│                                                                    │")
-        print("│  SKILL SELECTION                                                  │")
-        print("│    • Enter the number next to a skill to use it                   │")
-        print("│    • Or type part of the skill name (e.g. 'simple' or 'fusion')   │")
-        print("│    • Press Enter alone to accept the suggested action             │")
-        print("│                                                                    │")
-        print("│  GOAL                                                             │")
+        lines = [
+            "",
+            _BOX_TOP,
+            _box_title("HELP"),
+            _BOX_MID,
+            "│  FORECAST INPUT                                                   │",
+            "│    Turn 1: Enter all 4 control conditions (current + next 3)     │",
+            "│    Turn 2+: Previous forecast shifts automatically:              │",
+            "│             T1→T0, T2→T1, T3→T2, then you enter new T3           │",
+            "│    • 1.5 = +50% control (good for perfection skills)              │",
+            "│    • 1.0 = normal control                                         │",
+            "│    • 0.5 = -50% control (bad for perfection skills)               │",
+            "│    You can also enter 4 values to override the entire forecast   │",
+            "│                                                                    │",
+            "│  SKILL SELECTION                                                  │",
+            "│    • Enter the number next to a skill to use it                   │",
+            "│    • Or type part of the skill name (e.g. 'simple' or 'fusion')   │",
+            "│    • Press Enter alone to accept the suggested action             │",
+            "│                                                                    │",
+            "│  GOAL                                                             │",
+        ]
         if target_completion > 0 and target_perfection > 0:
-            print(
-                f"│    Reach Completion={target_completion}, Perfection={target_perfection}".ljust(
-                    69
+            lines.append(
+                _box_row(
+                    f"│    Reach Completion={target_completion}, Perfection={target_perfection}"
                 )
-                + "│"
             )
         else:
-            print(
-                "│    Maximize your Score = min(Completion, Perfection)              │"
-            )
-            print(
-                "│    Keep both bars balanced for the best result!                   │"
-            )
-        print("│                                                                    │")
-        print("│  COMMANDS: help, undo, status, quit                               │")
-        print("└" + "─" * 68 + "┘")
-        print()
+            lines += [
+                "│    Maximize your Score = min(Completion, Perfection)              │",
+                "│    Keep both bars balanced for the best result!                   │",
+            ]
+        lines += [
+            "│                                                                    │",
+            "│  COMMANDS: help, undo, status, quit                               │",
+            _BOX_BOTTOM,
+            "",
+        ]
+        print("\n".join(lines))
 
     def show_status():
-        print()
-        print("┌" + "─" * 68 + "┐")
-        print("│" + " DETAILED STATUS ".center(68) + "│")
-        print("├" + "─" * 68 + "┤")
-        print(
-            f"│  Qi:         {state.qi:3d}/{optimizer.max_qi}  {_make_bar(state.qi, optimizer.max_qi, 30)}  │"
-        )
-        print(
-            f"│  Stability:  {state.stability:3d}/{optimizer.max_stability}   {_make_bar(state.stability, optimizer.max_stability, 30)}  │"
-        )
+        lines = [
+            "",
+            _BOX_TOP,
+            _box_title("DETAILED STATUS"),
+            _BOX_MID,
+            f"│  Qi:         {state.qi:3d}/{optimizer.max_qi}  {_make_bar(state.qi, optimizer.max_qi, 30)}  │",
+            f"│  Stability:  {state.stability:3d}/{optimizer.max_stability}   {_make_bar(state.stability, optimizer.max_stability, 30)}  │",
+        ]
         if target_completion > 0 and target_perfection > 0:
-            print(
+            lines += [
                 f"│  Completion: {state.completion:3d}/{target_completion:<3d}  "
-                f"{_make_bar(state.completion, target_completion, 30)}  │"
-            )
-            print(
+                f"{_make_bar(state.completion, target_completion, 30)}  │",
                 f"│  Perfection: {state.perfection:3d}/{target_perfection:<3d}  "
-                f"{_make_bar(state.perfection, target_perfection, 30)}  │"
-            )
+                f"{_make_bar(state.perfection, target_perfection, 30)}  │",
+            ]
         else:
             comp_scale = max(100, state.completion)
             perf_scale = max(100, state.perfection)
-            print(
-                f"│  Completion: {state.completion:3d}      {_make_bar(state.completion, comp_scale, 30)}  │"
-            )
-            print(
-                f"│  Perfection: {state.perfection:3d}      {_make_bar(state.perfection, perf_scale, 30)}  │"
-            )
-        print("├" + "─" * 68 + "┤")
+            lines += [
+                f"│  Completion: {state.completion:3d}      {_make_bar(state.completion, comp_scale, 30)}  │",
+                f"│  Perfection: {state.perfection:3d}      {_make_bar(state.perfection, perf_scale, 30)}  │",
+            ]
         eff_intensity = state.get_intensity(optimizer.base_intensity)
         eff_control = state.get_control(optimizer.base_control)
         int_buff = " (+40% ACTIVE)" if state.intensity_buff_turns > 0 else ""
         ctrl_buff = " (+40% ACTIVE)" if state.control_buff_turns > 0 else ""
-        print(
-            f"│  Intensity: {optimizer.base_intensity} -> {eff_intensity}{int_buff}".ljust(
-                69
-            )
-            + "│"
-        )
-        print(
-            f"│  Control:   {optimizer.base_control} -> {eff_control}{ctrl_buff}".ljust(
-                69
-            )
-            + "│"
-        )
+        lines += [
+            _BOX_MID,
+            _box_row(
+                f"│  Intensity: {optimizer.base_intensity} -> {eff_intensity}{int_buff}"
+            ),
+            _box_row(f"│  Control:   {optimizer.base_control} -> {eff_control}{ctrl_buff}"),
+        ]
         if state.intensity_buff_turns > 0:
-            print(
-                f"│    Intensity buff: {state.intensity_buff_turns} turn(s) remaining".ljust(
-                    69
+            lines.append(
+                _box_row(
+                    f"│    Intensity buff: {state.intensity_buff_turns} turn(s) remaining"
                 )
-                + "│"
             )
         if state.control_buff_turns > 0:
-            print(
-                f"│    Control buff: {state.control_buff_turns} turn(s) remaining".ljust(
-                    69
+            lines.append(
+                _box_row(
+                    f"│    Control buff: {state.control_buff_turns} turn(s) remaining"
                 )
-                + "│"
             )
-        print("├" + "─" * 68 + "┤")
+        lines.append(_BOX_MID)
         if target_completion > 0 and target_perfection > 0:
             if state.targets_met(target_completion, target_perfection):
-                print(f"│  STATUS: ✓ TARGETS MET!".ljust(69) + "│")
+                lines.append(_box_row("│  STATUS: ✓ TARGETS MET!"))
             else:
                 comp_remaining = max(0, target_completion - state.completion)
                 perf_remaining = max(0, target_perfection - state.perfection)
-                print(
-                    f"│  REMAINING: Completion={comp_remaining}, Perfection={perf_remaining}".ljust(
-                        69
+                lines.append(
+                    _box_row(
+                        f"│  REMAINING: Completion={comp_remaining}, Perfection={perf_remaining}"
                     )
-                    + "│"
                 )
         else:
-            print(
-                f"│  SCORE: {state.get_score()} (min of Completion and Perfection)".ljust(
-                    69
+            lines.append(
+                _box_row(
+                    f"│  SCORE: {state.get_score()} (min of Completion and Perfection)"
                 )
-                + "│"
             )
-        print("└" + "─" * 68 + "┘")
+        lines.append(_BOX_BOTTOM)
         if state.history:
-            print()
-            print("  Actions taken so far:")
-            for i, action in enumerate(state.history, 1):
-                print(f"    {i}. {action}")
-        print()
+            lines += ["", "  Actions taken so far:"]
+            lines += [
+                f"    {i}. {action}"
+                for i, action in enumerate(optimizer.history_names(state), 1)
+            ]
+        lines.append("")
+        print("\n".join(lines))
 
     # Build skill list for selection
     skill_keys = list(optimizer.skills.keys())
+    # Lowercased display names for matching typed input, built once per session
+    lower_names = {sk: info[0].lower() for sk, info in optimizer.skills.items()}
 
     while not optimizer.is_terminal(state):
         # Check if targets are met
@@ -1097,29 +1994,27 @@ def interactive_mode(
                 print("\n  ✓ TARGETS MET! Ending craft session.")
                 break
 
-        # Turn header
-        print("┌" + "─" * 68 + "┐")
-        print("│" + f" TURN {turn} ".center(68) + "│")
-        print("└" + "─" * 68 + "┘")
-
-        # Compact status display
+        # Turn header and compact status display
         qi_bar = _make_bar(state.qi, optimizer.max_qi, 15)
         stab_bar = _make_bar(state.stability, optimizer.max_stability, 15)
-        print(
-            f"  Qi: {state.qi:3d}/{optimizer.max_qi} {qi_bar}   Stability: {state.stability:2d}/{optimizer.max_stability} {stab_bar}"
-        )
+        lines = [
+            _BOX_TOP,
+            _box_title(f"TURN {turn}"),
+            _BOX_BOTTOM,
+            f"  Qi: {state.qi:3d}/{optimizer.max_qi} {qi_bar}   Stability: {state.stability:2d}/{optimizer.max_stability} {stab_bar}",
+        ]
         if target_completion > 0 and target_perfection > 0:
-            print(
-                f"  Completion: {state.completion:3d}/{target_completion}                 Perfection: {state.perfection:3d}/{target_perfection}"
-            )
             comp_remaining = max(0, target_completion - state.completion)
             perf_remaining = max(0, target_perfection - state.perfection)
-            print(f"  ══► REMAINING: Comp={comp_remaining}, Perf={perf_remaining}")
+            lines += [
+                f"  Completion: {state.completion:3d}/{target_completion}                 Perfection: {state.perfection:3d}/{target_perfection}",
+                f"  ══► REMAINING: Comp={comp_remaining}, Perf={perf_remaining}",
+            ]
         else:
-            print(
-                f"  Completion: {state.completion:3d}                    Perfection: {state.perfection:3d}"
-            )
-            print(f"  ══► SCORE: {state.get_score()}")
+            lines += [
+                f"  Completion: {state.completion:3d}                    Perfection: {state.perfection:3d}",
+                f"  ══► SCORE: {state.get_score()}",
+            ]
 
         # Show active buffs inline
         buffs = []
@@ -1128,8 +2023,9 @@ def interactive_mode(
         if state.intensity_buff_turns > 0:
             buffs.append(f"Intensity +40% ({state.intensity_buff_turns}t)")
         if buffs:
-            print(f"  Active Buffs: {', '.join(buffs)}")
-        print()
+            lines.append(f"  Active Buffs: {', '.join(buffs)}")
+        lines.append("")
+        print("\n".join(lines))
 
         # Ask for forecast FIRST (player sees conditions before selecting skills)
         # On turn 1, ask for all 4 values. On subsequent turns, shift and ask for new T3.
@@ -1245,49 +2141,61 @@ def interactive_mode(
             break
 
         # Show suggestion with box
-        print("  ┌" + "─" * 50 + "┐")
-        print(f"  │ ★ SUGGESTED: {optimizer.skills[best_first][0]}".ljust(52) + "│")
-        print(
-            f"  │   {_format_skill_details(optimizer, best_first, state, control_forecast[0])}".ljust(
-                52
-            )
-            + "│"
+        suggested_row = f"  │ ★ SUGGESTED: {optimizer.skills[best_first][0]}"
+        details_row = "  │   " + _format_skill_details(
+            optimizer, best_first, state, control_forecast[0]
         )
-        print("  └" + "─" * 50 + "┘")
+        lines = [
+            _CARD_TOP,
+            f"{suggested_row:<52}│",
+            f"{details_row:<52}│",
+            _CARD_BOTTOM,
+        ]
 
         if plan and len(plan) > 1:
             if target_completion > 0 and target_perfection > 0:
-                print(
+                lines.append(
                     f"\n  Lookahead plan ({len(plan)} turns, progress: {horizon_score}/{target_completion + target_perfection}):"
                 )
             else:
-                print(
+                lines.append(
                     f"\n  Lookahead plan ({len(plan)} turns, expected score: {horizon_score}):"
                 )
             for i, k in enumerate(plan, 1):
                 marker = "→" if i == 1 else " "
-                print(f"    {marker} {i}. {optimizer.skills[k][0]}")
-            print()
-        else:
-            print()
+                lines.append(f"    {marker} {i}. {optimizer.skills[k][0]}")
+        lines.append("")
 
         # Show available skills with details
-        print("  Available skills:")
-        print("  " + "─" * 60)
+        lines += ["  Available skills:", _LIST_RULE]
         valid_skills = []
+        res = (
+            state.qi,
+            state.stability,
+            state.max_stability,
+            state.control_buff_turns,
+            state.intensity_buff_turns,
+        )
+        apply_fns = optimizer._apply_fns_for(control_forecast[0])
         for i, sk in enumerate(skill_keys, 1):
-            test_state = optimizer.apply_skill(
-                state, sk, control_condition=control_forecast[0]
+            # One compiled apply gives both feasibility and the gains to display
+            result = apply_fns[optimizer._skill_index[sk]](
+                res, state.completion, state.perfection
             )
-            if test_state is not None:
+            if result is not None:
                 skill_info = optimizer.skills[sk]
                 valid_skills.append((i, sk))
                 marker = " ★" if sk == best_first else "  "
                 details = _format_skill_details(
-                    optimizer, sk, state, control_forecast[0]
+                    optimizer,
+                    sk,
+                    state,
+                    control_forecast[0],
+                    gains=(result[1] - state.completion, result[2] - state.perfection),
                 )
-                print(f"  {marker} {i}. {skill_info[0]:<22} {details}")
-        print("  " + "─" * 60)
+                lines.append(f"  {marker} {i}. {skill_info[0]:<22} {details}")
+        lines.append(_LIST_RULE)
+        print("\n".join(lines))
 
         if not valid_skills:
             print("\n  No valid actions available.")
@@ -1353,10 +2261,7 @@ def interactive_mode(
                 choice_lower = choice.lower()
                 matches = []
                 for idx, sk in valid_skills:
-                    if (
-                        choice_lower in optimizer.skills[sk][0].lower()
-                        or choice_lower == sk
-                    ):
+                    if choice_lower in lower_names[sk] or choice_lower == sk:
                         matches.append((idx, sk))
                 if len(matches) == 1:
                     chosen_key = matches[0][1]
@@ -1393,9 +2298,8 @@ def interactive_mode(
         qi_cost = state.qi - new_state.qi
         stab_change = new_state.stability - state.stability
 
-        print()
-        print("  ╔" + "═" * 50 + "╗")
-        print(f"  ║ ✓ APPLIED: {skill_name}".ljust(52) + "║")
+        applied_row = f"  ║ ✓ APPLIED: {skill_name}"
+        lines = ["", _DOUBLE_CARD_TOP, f"{applied_row:<52}║"]
         changes = []
         if qi_cost > 0:
             changes.append(f"Qi -{qi_cost}")
@@ -1408,88 +2312,81 @@ def interactive_mode(
         if perf_gain > 0:
             changes.append(f"Perf +{perf_gain}")
         if changes:
-            print(f"  ║   {' │ '.join(changes)}".ljust(52) + "║")
-        print("  ╚" + "═" * 50 + "╝")
+            changes_row = f"  ║   {' │ '.join(changes)}"
+            lines.append(f"{changes_row:<52}║")
+        lines += [_DOUBLE_CARD_BOTTOM, ""]
+        print("\n".join(lines))
 
         state = new_state
         current_forecast = control_forecast  # Save for next turn's shift
         turn += 1
-        print()
 
     # Final summary
-    print()
-    print("╔" + "═" * 68 + "╗")
-    print("║" + " CRAFT COMPLETE ".center(68) + "║")
-    print("╚" + "═" * 68 + "╝")
-    print()
-    print("┌" + "─" * 68 + "┐")
-    print("│" + " FINAL RESULTS ".center(68) + "│")
-    print("├" + "─" * 68 + "┤")
-    print(f"│  Qi Remaining:  {state.qi:3d}/{optimizer.max_qi}".ljust(69) + "│")
-    print(
-        f"│  Stability:     {state.stability:3d}/{optimizer.max_stability}".ljust(69)
-        + "│"
-    )
-    print("├" + "─" * 68 + "┤")
+    lines = [
+        "",
+        _DOUBLE_TOP,
+        "║" + " CRAFT COMPLETE ".center(68) + "║",
+        _DOUBLE_BOTTOM,
+        "",
+        _BOX_TOP,
+        _box_title("FINAL RESULTS"),
+        _BOX_MID,
+        _box_row(f"│  Qi Remaining:  {state.qi:3d}/{optimizer.max_qi}"),
+        _box_row(f"│  Stability:     {state.stability:3d}/{optimizer.max_stability}"),
+        _BOX_MID,
+    ]
     if target_completion > 0 and target_perfection > 0:
         comp_bar = _make_bar(state.completion, target_completion, 30)
         perf_bar = _make_bar(state.perfection, target_perfection, 30)
-        print(
-            f"│  Completion:    {state.completion:3d}/{target_completion}  {comp_bar}".ljust(
-                69
-            )
-            + "│"
-        )
-        print(
-            f"│  Perfection:    {state.perfection:3d}/{target_perfection}  {perf_bar}".ljust(
-                69
-            )
-            + "│"
-        )
+        lines += [
+            _box_row(
+                f"│  Completion:    {state.completion:3d}/{target_completion}  {comp_bar}"
+            ),
+            _box_row(
+                f"│  Perfection:    {state.perfection:3d}/{target_perfection}  {perf_bar}"
+            ),
+        ]
     else:
-        print(
-            f"│  Completion:    {state.completion:3d}  {_make_bar(state.completion, 100, 30)}".ljust(
-                69
-            )
-            + "│"
-        )
-        print(
-            f"│  Perfection:    {state.perfection:3d}  {_make_bar(state.perfection, 100, 30)}".ljust(
-                69
-            )
-            + "│"
-        )
-    print("├" + "─" * 68 + "┤")
+        lines += [
+            _box_row(
+                f"│  Completion:    {state.completion:3d}  {_make_bar(state.completion, 100, 30)}"
+            ),
+            _box_row(
+                f"│  Perfection:    {state.perfection:3d}  {_make_bar(state.perfection, 100, 30)}"
+            ),
+        ]
+    lines.append(_BOX_MID)
     if target_completion > 0 and target_perfection > 0:
         if state.targets_met(target_completion, target_perfection):
-            print(f"│  ★ TARGETS MET!".ljust(69) + "│")
+            lines.append(_box_row("│  ★ TARGETS MET!"))
         else:
             comp_remaining = max(0, target_completion - state.completion)
             perf_remaining = max(0, target_perfection - state.perfection)
-            print(f"│  ✗ Targets not fully reached".ljust(69) + "│")
-            print(
-                f"│    Remaining: Completion={comp_remaining}, Perfection={perf_remaining}".ljust(
-                    69
-                )
-                + "│"
-            )
+            lines += [
+                _box_row("│  ✗ Targets not fully reached"),
+                _box_row(
+                    f"│    Remaining: Completion={comp_remaining}, Perfection={perf_remaining}"
+                ),
+            ]
     else:
         score = state.get_score()
-        print(f"│  ★ FINAL SCORE: {score}".ljust(69) + "│")
+        lines.append(_box_row(f"│  ★ FINAL SCORE: {score}"))
         if state.completion != state.perfection:
             diff = abs(state.completion - state.perfection)
             lower = (
                 "Completion" if state.completion < state.perfection else "Perfection"
             )
-            print(f"│    (Limited by {lower}, {diff} points behind)".ljust(69) + "│")
-    print("└" + "─" * 68 + "┘")
+            lines.append(_box_row(f"│    (Limited by {lower}, {diff} points behind)"))
+    lines.append(_BOX_BOTTOM)
 
     if state.history:
-        print()
-        print(f"  Actions taken ({len(state.history)} total):")
-        for i, action in enumerate(state.history, 1):
-            print(f"    {i}. {action}")
-    print()
+        lines += ["", f"  Actions taken ({len(state.history)} total):"]
+        lines += [
+            f"    {i}. {action}"
+            for i, action in enumerate(optimizer.history_names(state), 1)
+        ]
+    lines.append("")
+    print("\n".join(lines))
 
 
 def main():
@@ -1564,35 +2461,11 @@ def main():
         raise SystemExit(
             "Both -c/--target-completion and -p/--target-perfection must be provided together (or use -t)."
         )
+    has_targets = args.target_completion > 0 and args.target_perfection > 0
 
-    optimizer = CraftingOptimizer(config_path=args.config)
-
-    print("=" * 70)
-    print("ASCEND FROM NINE MOUNTAINS - CRAFTING OPTIMIZER")
-    print("=" * 70)
-    print(f"\nYour Stats:")
-    print(f"  Max Qi: {optimizer.max_qi}")
-    print(f"  Max Stability: {optimizer.max_stability}")
-    print(f"  Intensity: {optimizer.base_intensity} (affects completion)")
-    print(f"  Control: {optimizer.base_control} (affects perfection)")
-    print(f"\nRules:")
-    print(f"  - Most actions cost stability; see skills/config for exact costs")
-    print(
-        f"  - Stability must stay >= {optimizer.min_stability} (restore before dropping below)"
-    )
-    if args.target_completion > 0 and args.target_perfection > 0:
-        print(
-            f"  - Goal: Reach Completion={args.target_completion}, Perfection={args.target_perfection}"
-        )
-    else:
-        print(f"  - Goal: Maximize min(Completion, Perfection)")
-    print()
-
-    if args.interactive:
-        interactive_mode(optimizer, args.target_completion, args.target_perfection)
-        return
-
-    if args.suggest_next:
+    # Validate the forecast before loading config or printing anything
+    # (interactive mode asks for its own forecast and ignores this one)
+    if args.suggest_next and not args.interactive:
         if not args.forecast_control:
             raise SystemExit(
                 "--suggest-next requires --forecast-control, e.g. --forecast-control '1.5,1,0.5,1'"
@@ -1604,6 +2477,35 @@ def main():
                 "(current turn + next 3), e.g. --forecast-control '1.5,1,0.5,1'"
             )
 
+    optimizer = CraftingOptimizer(config_path=args.config)
+
+    lines = [
+        _RULE,
+        "ASCEND FROM NINE MOUNTAINS - CRAFTING OPTIMIZER",
+        _RULE,
+        "\nYour Stats:",
+        f"  Max Qi: {optimizer.max_qi}",
+        f"  Max Stability: {optimizer.max_stability}",
+        f"  Intensity: {optimizer.base_intensity} (affects completion)",
+        f"  Control: {optimizer.base_control} (affects perfection)",
+        "\nRules:",
+        "  - Most actions cost stability; see skills/config for exact costs",
+        f"  - Stability must stay >= {optimizer.min_stability} (restore before dropping below)",
+    ]
+    if has_targets:
+        lines.append(
+            f"  - Goal: Reach Completion={args.target_completion}, Perfection={args.target_perfection}"
+        )
+    else:
+        lines.append("  - Goal: Maximize min(Completion, Perfection)")
+    lines.append("")
+    print("\n".join(lines))
+
+    if args.interactive:
+        interactive_mode(optimizer, args.target_completion, args.target_perfection)
+        return
+
+    if args.suggest_next:
         start_state = State(
             qi=optimizer.max_qi,
             stability=optimizer.max_stability,
@@ -1612,7 +2514,7 @@ def main():
             perfection=0,
             control_buff_turns=0,
             intensity_buff_turns=0,
-            history=[],
+            history=array("H"),
         )
 
         best_first, plan, horizon_score = suggest_next_turn(
@@ -1622,31 +2524,36 @@ def main():
             args.target_completion,
             args.target_perfection,
         )
-        print("=" * 70)
-        print("NEXT-TURN SUGGESTION")
-        print("=" * 70)
-        print(
-            f"\nControl forecast: {', '.join(f'x{m:g}' for m in args.forecast_control)}"
-        )
-        if args.target_completion > 0 and args.target_perfection > 0:
-            print(
+        lines = [
+            _RULE,
+            "NEXT-TURN SUGGESTION",
+            _RULE,
+            f"\nControl forecast: {', '.join(f'x{m:g}' for m in args.forecast_control)}",
+        ]
+        if has_targets:
+            lines.append(
                 f"Targets: Completion={args.target_completion}, Perfection={args.target_perfection}"
             )
         if best_first is None:
-            print("\nNo valid action found from this state.")
+            lines.append("\nNo valid action found from this state.")
+            print("\n".join(lines))
             return
-        print(f"\nBest next action: {optimizer.skills[best_first][0]}")
+        lines.append(f"\nBest next action: {optimizer.skills[best_first][0]}")
         if plan:
-            print(f"Best {len(plan)}-turn plan (within forecast horizon):")
-            for i, k in enumerate(plan, 1):
-                print(f"  {i}. {optimizer.skills[k][0]}")
+            lines.append(f"Best {len(plan)}-turn plan (within forecast horizon):")
+            lines += [
+                f"  {i}. {optimizer.skills[k][0]}" for i, k in enumerate(plan, 1)
+            ]
+        print("\n".join(lines))
+        # A target-mode plan with no progress at all has nothing worth replaying
+        if plan and (horizon_score > 0 or not has_targets):
             optimizer.print_detailed_rotation(
                 plan,
                 target_completion=args.target_completion,
                 target_perfection=args.target_perfection,
                 control_conditions=args.forecast_control,
             )
-        if args.target_completion > 0 and args.target_perfection > 0:
+        if has_targets:
             print(
                 f"\nHorizon progress after lookahead: {horizon_score}/{args.target_completion + args.target_perfection}"
             )
@@ -1654,25 +2561,21 @@ def main():
             print(f"\nHorizon score (min) after lookahead: {horizon_score}")
         return
 
-    print("=" * 70)
-    print("SEARCHING FOR OPTIMAL ROTATION...")
-    print("=" * 70)
+    print(
+        f"{_RULE}\nSEARCHING FOR OPTIMAL ROTATION...\n{_RULE}\n"
+        "\nRunning exhaustive search (this may take a moment)..."
+    )
 
     # Exhaustive search for optimal
-    print("\nRunning exhaustive search (this may take a moment)...")
     optimal_state = optimizer.search_optimal(
         args.target_completion, args.target_perfection
     )
 
-    print("\n" + "-" * 70)
-    print("OPTIMAL ROTATION FOUND")
-    print("-" * 70)
+    print(f"\n{_THIN_RULE}\nOPTIMAL ROTATION FOUND\n{_THIN_RULE}")
     optimizer.print_state(optimal_state, args.target_completion, args.target_perfection)
 
-    # Get skill keys from history names for detailed breakdown
-    rotation_keys = []
-    for name in optimal_state.history:
-        rotation_keys.append(optimizer.get_skill_key_from_name(name))
+    # Skill keys for the detailed breakdown
+    rotation_keys = optimizer.history_keys(optimal_state)
 
     optimizer.print_detailed_rotation(
         rotation_keys,
@@ -1681,38 +2584,35 @@ def main():
     )
 
     # Also run greedy for comparison
-    print("\n" + "-" * 70)
-    print("GREEDY SEARCH (for comparison)")
-    print("-" * 70)
+    print(f"\n{_THIN_RULE}\nGREEDY SEARCH (for comparison)\n{_THIN_RULE}")
     greedy_state = optimizer.greedy_search(
         args.target_completion, args.target_perfection
     )
     optimizer.print_state(greedy_state, args.target_completion, args.target_perfection)
 
     # Final recommendation
-    print("\n" + "=" * 70)
-    print("RECOMMENDED SKILL ROTATION")
-    print("=" * 70)
-    if args.target_completion > 0 and args.target_perfection > 0:
+    lines = ["\n" + _RULE, "RECOMMENDED SKILL ROTATION", _RULE]
+    if has_targets:
         if optimal_state.targets_met(args.target_completion, args.target_perfection):
-            print(f"\n✓ TARGETS MET!")
+            lines.append("\n✓ TARGETS MET!")
         else:
-            print(f"\n✗ Targets not fully reached")
-        print(
-            f"Target Completion: {args.target_completion}, Achieved: {optimal_state.completion}"
-        )
-        print(
-            f"Target Perfection: {args.target_perfection}, Achieved: {optimal_state.perfection}"
-        )
+            lines.append("\n✗ Targets not fully reached")
+        lines += [
+            f"Target Completion: {args.target_completion}, Achieved: {optimal_state.completion}",
+            f"Target Perfection: {args.target_perfection}, Achieved: {optimal_state.perfection}",
+        ]
     else:
-        print(
-            f"\nBest Score: {optimal_state.get_score()} (min of Completion and Perfection)"
-        )
-        print(f"Final Completion: {optimal_state.completion}")
-        print(f"Final Perfection: {optimal_state.perfection}")
-    print(f"\nUse these skills in order:")
-    for i, action in enumerate(optimal_state.history, 1):
-        print(f"  {i}. {action}")
+        lines += [
+            f"\nBest Score: {optimal_state.get_score()} (min of Completion and Perfection)",
+            f"Final Completion: {optimal_state.completion}",
+            f"Final Perfection: {optimal_state.perfection}",
+        ]
+    lines.append("\nUse these skills in order:")
+    lines += [
+        f"  {i}. {action}"
+        for i, action in enumerate(optimizer.history_names(optimal_state), 1)
+    ]
+    print("\n".join(lines))
 
 
 if __name__ == "__main__":